@@ -9,7 +9,7 @@ import uuid
 import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import desc
 
 from database.models import ConversationModel, MessageModel
@@ -78,14 +78,10 @@ def get_conversation(
     query = db.query(ConversationModel).filter(ConversationModel.id == conversation_id)
     
     if include_messages:
-        conversation = query.first()
-        if conversation:
-            # Messages are loaded via the relationship
-            return conversation
-    else:
-        return query.first()
+        # Load the messages up front instead of lazily on first access
+        query = query.options(selectinload(ConversationModel.messages))
     
-    return None
+    return query.first()
 
 
 def get_all_conversations(
@@ -93,10 +89,13 @@ def get_all_conversations(
     skip: int = 0,
     limit: int = 100,
     user_id: Optional[str] = None
-) -> List[ConversationModel]:
+) -> List[Dict[str, Any]]:
     """
     Get all conversations with optional pagination and filtering.
     
+    Message counts are selected in the same query, so listing does not load each
+    conversation's messages.
+    
     Args:
         db: Database session
         skip: Number of conversations to skip
@@ -104,14 +103,17 @@ def get_all_conversations(
         user_id: Optional user ID to filter by
         
     Returns:
-        List[ConversationModel]: List of conversations
+        List[Dict[str, Any]]: Conversation dictionaries including their message_count
     """
-    query = db.query(ConversationModel).order_by(desc(ConversationModel.updated_at))
+    query = db.query(ConversationModel, ConversationModel.message_count).order_by(desc(ConversationModel.updated_at))
     
     if user_id:
         query = query.filter(ConversationModel.user_id == user_id)
     
-    return query.offset(skip).limit(limit).all()
+    return [
+        {**conversation.to_dict(), "message_count": message_count}
+        for conversation, message_count in query.offset(skip).limit(limit).all()
+    ]
 
 
 def update_conversation(
@@ -292,8 +294,8 @@ def get_message_history(
     Returns:
         List[Dict[str, Any]]: List of messages in the format expected by LLM providers
     """
-    # Get the conversation with all messages
-    conversation = get_conversation(db, conversation_id)
+    # Get the conversation with all messages in the caller's session
+    conversation = get_conversation(db, conversation_id, include_messages=True)
     
     if not conversation:
         logger.warning(f"Conversation not found: {conversation_id}")
@@ -7,7 +7,7 @@ This module defines the database tables using SQLAlchemy ORM.
 import uuid
 import json
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Index
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Index, select, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 
@@ -32,7 +32,26 @@ class ConversationModel(Base):
     _metadata = Column("metadata", Text, nullable=True)
     
     # Define relationship with messages
-    messages = relationship("MessageModel", back_populates="conversation", cascade="all, delete-orphan")
+    messages = relationship(
+        "MessageModel",
+        back_populates="conversation",
+        cascade="all, delete-orphan",
+        order_by="MessageModel.created_at"
+    )
+    
+    @hybrid_property
+    def message_count(self):
+        """Get the number of messages in the conversation."""
+        return len(self.messages)
+    
+    @message_count.expression
+    def message_count(cls):
+        """Count the conversation's messages with a correlated subquery."""
+        return (
+            select(func.count(MessageModel.id))
+            .where(MessageModel.conversation_id == cls.id)
+            .scalar_subquery()
+        )
     
     @hybrid_property
     def metadata_dict(self):
@@ -115,9 +115,10 @@ class AnthropicChat:
         Returns:
             The complete response text
         """
-        full_response = ""
+        # Collect the text deltas and join them once instead of growing a string per event
+        parts: List[str] = []
         for event in self.stream_chat_completion(model, messages, **kwargs):
             if event.type == "content_block_delta":
-                full_response += event.delta.text
+                parts.append(event.delta.text)
         
-        return full_response
\ No newline at end of file
+        return "".join(parts)
\ No newline at end of file
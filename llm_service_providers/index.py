@@ -5,17 +5,60 @@ This module provides a unified interface for interacting with different LLM serv
 It automatically selects the appropriate provider based on the requested model.
 """
 
-from typing import Dict, List, Any, Generator, Optional
+import hashlib
+import logging
+import re
+import time
+from typing import Dict, List, Any, Generator, Optional, Tuple
 from dotenv import load_dotenv
 
 from llm_service_providers.openai import OpenAIChat
 from llm_service_providers.anthropic import AnthropicChat
-from misc.constants import Provider, MODEL_PROVIDER_MAP, CONVERSATION_MESSAGES_THRESHOLD
-from misc.db import get_conversation
+from misc.constants import (
+    Provider,
+    MODEL_PROVIDER_MAP,
+    CONVERSATION_MESSAGES_THRESHOLD,
+    MIN_SUMMARIZE_BATCH,
+    AVAILABLE_MODELS_CACHE_TTL
+)
+from misc.db import get_conversation, get_conversation_summary, save_conversation_summary
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger("chatapp-v2-api.llm")
+
+# Message roles passed on to the LLM providers; messages with other roles are dropped
+VALID_MESSAGE_ROLES = frozenset({'user', 'assistant', 'system'})
+
+# Image/attachment references replaced with <resource /> before summarizing, in one pass:
+# markdown images ![alt](url), HTML <img> tags, base64 image data URIs and [attachment:...] tokens
+RESOURCE_REFERENCE_RE = re.compile(
+    r'!\[.*?\]\(.*?\)'
+    r'|<img[^>]*>'
+    r'|data:image/[^;]+;base64,[^"\s]+'
+    r'|\[attachment:.*?\]'
+)
+
+
+def _messages_digest(messages: List[Dict[str, str]]) -> str:
+    """
+    Digest the roles and contents of messages, used to tell whether a stored summary is stale.
+    
+    Args:
+        messages: A list of message dictionaries with 'role' and 'content' keys
+        
+    Returns:
+        A hex digest that changes when any message is edited, added or removed
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for msg in messages:
+        digest.update(msg['role'].encode())
+        digest.update(b'\0')
+        digest.update(msg['content'].encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
 
 class LLMServiceProvider:
     """
@@ -33,6 +76,9 @@ class LLMServiceProvider:
         """
         self.providers = {}
         
+        # Cached result of get_available_models as (expiry, models)
+        self._models_cache: Optional[Tuple[float, Dict[str, List[str]]]] = None
+        
         # Initialize OpenAI provider if API key is available
         try:
             self.providers[Provider.OPENAI] = OpenAIChat(api_key=openai_api_key)
@@ -139,9 +185,16 @@ class LLMServiceProvider:
         """
         Get a dictionary of available models grouped by provider.
         
+        The result is cached for AVAILABLE_MODELS_CACHE_TTL seconds. Call
+        invalidate_models_cache() to force a refresh, e.g. after API keys change.
+        
         Returns:
             A dictionary where keys are provider names and values are lists of model names
         """
+        now = time.monotonic()
+        if self._models_cache is not None and self._models_cache[0] > now:
+            return self._models_cache[1]
+        
         available_models = {}
         
         for provider_name in self.providers:
@@ -150,9 +203,21 @@ class LLMServiceProvider:
                 if provider == provider_name
             ]
         
+        self._models_cache = (now + AVAILABLE_MODELS_CACHE_TTL, available_models)
         return available_models
+    
+    def invalidate_models_cache(self) -> None:
+        """
+        Clear the cached result of get_available_models.
+        """
+        self._models_cache = None
         
-    def get_message_history(self, conversation_id: str, summarize: bool = True) -> List[Dict[str, str]]:
+    def get_message_history(
+        self,
+        conversation_id: str,
+        summarize: bool = True,
+        messages: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, str]]:
         """
         Fetch messages for a conversation and handle summarization for long conversations.
         
@@ -162,9 +227,19 @@ class LLMServiceProvider:
         2. Summarize the older messages
         3. Add the summary as a system message at the beginning
         
+        Fewer than MIN_SUMMARIZE_BATCH older messages are not worth an LLM call, so
+        until that many have accumulated all messages are returned unsummarized.
+        
+        The latest summary of each conversation is stored with the number and a digest
+        of the messages it covers, so repeated calls on an unchanged conversation reuse
+        it instead of calling the LLM again. A summary store that cannot be read or
+        written is skipped and the summary is generated as usual.
+        
         Args:
             conversation_id: The ID of the conversation to fetch messages for
             summarize: Whether to summarize older messages if they exceed the threshold (default: True)
+            messages: Optional messages already fetched for this conversation (e.g. the
+                'messages' of get_conversation); when given, the database is not queried
             
         Returns:
             A list of message dictionaries with 'role' and 'content' keys,
@@ -173,25 +248,23 @@ class LLMServiceProvider:
         Raises:
             ValueError: If the conversation is not found
         """
-        # Fetch the conversation from the database
-        conversation = get_conversation(conversation_id)
-        if not conversation:
-            raise ValueError(f"Conversation with ID {conversation_id} not found")
-        
-        # Extract messages from the conversation
-        db_messages = conversation.get('messages', [])
-        
-        # Convert database messages to the format expected by LLM providers
-        messages = []
-        for msg in db_messages:
-            # Skip messages with invalid roles
-            if msg['role'] not in ['user', 'assistant', 'system']:
-                continue
-                
-            messages.append({
-                'role': msg['role'],
-                'content': msg['content']
-            })
+        if messages is None:
+            # Fetch the conversation from the database
+            conversation = get_conversation(conversation_id)
+            if not conversation:
+                raise ValueError(f"Conversation with ID {conversation_id} not found")
+            
+            # Extract messages from the conversation
+            db_messages = conversation.get('messages', [])
+        else:
+            db_messages = messages
+        
+        # Convert database messages to the format expected by LLM providers, skipping invalid roles
+        messages = [
+            {'role': msg['role'], 'content': msg['content']}
+            for msg in db_messages
+            if msg['role'] in VALID_MESSAGE_ROLES
+        ]
         
         # If messages don't exceed threshold, return as is
         if len(messages) <= CONVERSATION_MESSAGES_THRESHOLD:
@@ -201,31 +274,47 @@ class LLMServiceProvider:
         if not summarize:
             return messages
         
-        # Split messages: keep recent ones and summarize older ones
-        recent_messages = messages[-CONVERSATION_MESSAGES_THRESHOLD:]
-        older_messages = messages[:-CONVERSATION_MESSAGES_THRESHOLD]
+        # Split messages: keep recent ones and summarize the older ones before the split index
+        split = len(messages) - CONVERSATION_MESSAGES_THRESHOLD
+        
+        # Keep a small overflow inline rather than paying for a summary of a few messages
+        if split < MIN_SUMMARIZE_BATCH:
+            return messages
+        
+        older_messages = messages[:split]
+        recent_messages = messages[split:]
+        digest = _messages_digest(older_messages)
+        
+        # Reuse a stored summary of exactly these older messages
+        try:
+            summary = get_conversation_summary(conversation_id, split, digest)
+        except Exception as e:
+            logger.warning(f"Error reading stored summary for conversation {conversation_id}: {e}")
+            summary = None
         
-        # Only summarize if there are older messages
-        if older_messages:
-            try:
-                # Generate a summary of the older messages
+        try:
+            if summary is None:
                 summary = self.brief_summary_of_conversation_history(older_messages)
                 
-                # Add the summary as a system message at the beginning
-                summary_message = {
-                    'role': 'system',
-                    'content': f"Summary of previous conversation: \n{summary}"
-                }
-                
-                # Return the summary followed by recent messages
-                return [summary_message] + recent_messages
-            except Exception as e:
-                # If summarization fails, log the error and return just the recent messages
-                print(f"Error summarizing conversation history: {e}")
-                return recent_messages
-        
-        # If we somehow got here, return the recent messages
-        return recent_messages
+                # Store the new summary; failing to store it does not affect this response
+                try:
+                    save_conversation_summary(conversation_id, split, digest, summary)
+                except Exception as e:
+                    logger.warning(f"Error storing summary for conversation {conversation_id}: {e}")
+            
+            # Add the summary as a system message at the beginning
+            summary_message = {
+                'role': 'system',
+                'content': f"Summary of previous conversation: \n{summary}"
+            }
+            
+            # Return the summary followed by recent messages
+            recent_messages.insert(0, summary_message)
+            return recent_messages
+        except Exception as e:
+            # If summarization fails, log the error and return just the recent messages
+            logger.error(f"Error summarizing conversation history: {e}")
+            return recent_messages
     
     def brief_summary_of_conversation_history(
         self,
@@ -262,20 +351,9 @@ class LLMServiceProvider:
             # Create a copy of the message to avoid modifying the original
             processed_msg = msg.copy()
             
-            # Check if content contains image/attachment references and replace them
+            # Replace image/attachment references with a <resource /> tag
             if "content" in processed_msg and processed_msg["content"]:
-                # Replace image markdown format ![alt](url)
-                import re
-                processed_msg["content"] = re.sub(r'!\[.*?\]\(.*?\)', '<resource />', processed_msg["content"])
-                
-                # Replace HTML image tags
-                processed_msg["content"] = re.sub(r'<img[^>]*>', '<resource />', processed_msg["content"])
-                
-                # Replace base64 encoded images
-                processed_msg["content"] = re.sub(r'data:image\/[^;]+;base64,[^\"\s]+', '<resource />', processed_msg["content"])
-                
-                # Replace attachment references (assuming a specific format, adjust as needed)
-                processed_msg["content"] = re.sub(r'\[attachment:.*?\]', '<resource />', processed_msg["content"])
+                processed_msg["content"] = RESOURCE_REFERENCE_RE.sub('<resource />', processed_msg["content"])
             
             processed_messages.append(processed_msg)
         
@@ -85,10 +85,11 @@ class OpenAIChat:
         Returns:
             The complete response text
         """
-        full_response = ""
+        # Collect the deltas and join them once instead of growing a string per chunk
+        parts: List[str] = []
         for chunk in self.stream_chat_completion(model, messages, **kwargs):
             content = chunk.choices[0].delta.content
             if content is not None:
-                full_response += content
+                parts.append(content)
         
-        return full_response
\ No newline at end of file
+        return "".join(parts)
\ No newline at end of file
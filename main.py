@@ -4,6 +4,7 @@ from contextlib import asynccontextmanager
 import logging
 from dotenv import load_dotenv
 import os
+from typing import Dict
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -61,7 +62,7 @@ app.include_router(conversations_router, prefix="/api", tags=["conversations"])
 # The database initialization is now handled in the lifespan context manager
 
 
-@app.get("/")
+@app.get("/", response_model=Dict[str, str])
 async def root():
     return {"message": "Welcome to ChatApp v2 API"}
 
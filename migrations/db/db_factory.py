@@ -54,6 +54,34 @@ else:
     raise ValueError(f"Unsupported database type: {DB_TYPE}")
 
 
+def get_implementation(db_type: str):
+    """
+    Get the database implementation module for a specific database type.
+    
+    Unlike the module-level functions, which are bound once from DB_TYPE at import
+    time, this lets callers use several backends side by side in one process.
+    
+    Args:
+        db_type: The database type ('sqlite' or 'azure_sql')
+        
+    Returns:
+        module: A module exposing create_conversation, add_message, get_conversation,
+            get_all_conversations and delete_conversation
+        
+    Raises:
+        ValueError: If the database type is not supported
+    """
+    db_type = db_type.lower()
+    if db_type == "sqlite":
+        import misc.db as implementation
+    elif db_type == "azure_sql":
+        import migrations.db.db_azure as implementation
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+    
+    return implementation
+
+
 # Function to get the current database type
 def get_db_type() -> str:
     """
@@ -34,6 +34,10 @@ DEFAULT_MODELS = {
 
 # Conversation settings
 CONVERSATION_MESSAGES_THRESHOLD = 20  # Maximum number of messages to include before summarizing
+MIN_SUMMARIZE_BATCH = 20  # Minimum number of older messages worth an LLM summarization call
+
+# Model listing settings
+AVAILABLE_MODELS_CACHE_TTL = 300  # Seconds to cache the available models before recomputing
 
 # Model capabilities and features
 MODEL_CAPABILITIES = {
@@ -16,6 +16,13 @@ import uuid
 # Database file path
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "chatapp-v2.db")
 
+# Statements reused on every call are kept as constants so each connection's
+# statement cache hands back the already-prepared statement
+INSERT_MSG_SQL = '''
+INSERT INTO messages (id, conversation_id, role, content, created_at, tokens, model, metadata)
+VALUES (?, ?, ?, ?, datetime('now'), ?, ?, ?)
+'''
+
 
 @contextmanager
 def get_db_connection():
@@ -25,7 +32,7 @@ def get_db_connection():
     Yields:
         sqlite3.Connection: A database connection with row factory set to sqlite3.Row
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, cached_statements=256)
     conn.row_factory = sqlite3.Row
     try:
         yield conn
@@ -33,6 +40,24 @@ def get_db_connection():
         conn.close()
 
 
+@contextmanager
+def use_connection(conn: Optional[sqlite3.Connection] = None):
+    """
+    Context manager that reuses an existing connection or opens a new one.
+    
+    Args:
+        conn: Optional open connection owned by the caller
+        
+    Yields:
+        sqlite3.Connection: The given connection, or a new one that is closed on exit
+    """
+    if conn is not None:
+        yield conn
+    else:
+        with get_db_connection() as new_conn:
+            yield new_conn
+
+
 def init_db():
     """
     Initialize the database by creating necessary tables if they don't exist.
@@ -74,11 +99,31 @@ def init_db():
         # Create index for faster queries
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_conversation_id ON messages (conversation_id)')
         
+        # Summaries are a regenerable cache; drop a table from before the digest column existed
+        cursor.execute('PRAGMA table_info(conversation_summaries)')
+        summary_columns = {row['name'] for row in cursor.fetchall()}
+        if summary_columns and 'digest' not in summary_columns:
+            cursor.execute('DROP TABLE conversation_summaries')
+        
+        # Create conversation summaries table; one row per conversation holds the latest summary
+        # of its first message_count messages, and digest identifies the exact messages covered
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS conversation_summaries (
+            conversation_id TEXT PRIMARY KEY,
+            message_count INTEGER NOT NULL,
+            digest TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (conversation_id) REFERENCES conversations (id) ON DELETE CASCADE
+        )
+        ''')
+        
         conn.commit()
 
 
 def create_conversation(title: str, model: str, system_prompt: Optional[str] = None, 
-                       user_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> str:
+                       user_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None,
+                       conn: Optional[sqlite3.Connection] = None) -> str:
     """
     Create a new conversation.
     
@@ -88,14 +133,15 @@ def create_conversation(title: str, model: str, system_prompt: Optional[str] = N
         system_prompt: Optional system prompt for the conversation
         user_id: Optional user identifier
         metadata: Optional metadata as a dictionary
+        conn: Optional open connection to reuse; the caller is then responsible for committing
         
     Returns:
         str: The ID of the created conversation
     """
     conversation_id = str(uuid.uuid4())
     
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+    with use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
         
         cursor.execute('''
         INSERT INTO conversations (id, title, created_at, updated_at, user_id, model, system_prompt, first_user_message, first_assistant_message, metadata)
@@ -109,14 +155,16 @@ def create_conversation(title: str, model: str, system_prompt: Optional[str] = N
             json.dumps(metadata) if metadata else None
         ))
         
-        conn.commit()
+        if conn is None:
+            db_conn.commit()
     
     return conversation_id
 
 
 def add_message(conversation_id: str, role: str, content: str, 
                tokens: Optional[int] = None, model: Optional[str] = None,
-               metadata: Optional[Dict[str, Any]] = None) -> str:
+               metadata: Optional[Dict[str, Any]] = None,
+               conn: Optional[sqlite3.Connection] = None) -> str:
     """
     Add a message to a conversation.
     
@@ -127,20 +175,18 @@ def add_message(conversation_id: str, role: str, content: str,
         tokens: Optional token count
         model: Optional model used for this specific message
         metadata: Optional metadata as a dictionary
+        conn: Optional open connection to reuse; the caller is then responsible for committing
         
     Returns:
         str: The ID of the created message
     """
     message_id = str(uuid.uuid4())
     
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+    with use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
         
         # Add the message
-        cursor.execute('''
-        INSERT INTO messages (id, conversation_id, role, content, created_at, tokens, model, metadata)
-        VALUES (?, ?, ?, ?, datetime('now'), ?, ?, ?)
-        ''', (
+        cursor.execute(INSERT_MSG_SQL, (
             message_id,
             conversation_id,
             role,
@@ -193,23 +239,81 @@ def add_message(conversation_id: str, role: str, content: str,
             WHERE id = ?
             ''', (conversation_id,))
         
-        conn.commit()
+        if conn is None:
+            db_conn.commit()
     
     return message_id
 
 
-def get_conversation(conversation_id: str) -> Dict[str, Any]:
+def bulk_add_messages(conversation_id: str, messages: List[Dict[str, Any]],
+                      conn: Optional[sqlite3.Connection] = None) -> List[str]:
+    """
+    Add several messages to a conversation with one statement and one commit.
+    
+    The conversation's first user/assistant message previews are filled in the same
+    way add_message does, but with a single UPDATE for the whole batch. Messages of a
+    batch share a created_at; reads order ties by insertion, so they keep their order.
+    
+    Args:
+        conversation_id: The ID of the conversation
+        messages: Message dictionaries in conversation order, with 'role' and 'content' keys
+            and optional 'tokens', 'model' and 'metadata' keys as accepted by add_message
+        conn: Optional open connection to reuse; the caller is then responsible for committing
+        
+    Returns:
+        List[str]: The IDs of the created messages, in order
+    """
+    message_ids = [str(uuid.uuid4()) for _ in messages]
+    
+    # First message of each role in this batch, truncated like add_message does
+    first_user_message = next((msg['content'][:100] for msg in messages if msg['role'] == 'user'), None)
+    first_assistant_message = next((msg['content'][:100] for msg in messages if msg['role'] == 'assistant'), None)
+    
+    with use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
+        
+        cursor.executemany(INSERT_MSG_SQL, [
+            (
+                message_id,
+                conversation_id,
+                msg['role'],
+                msg['content'],
+                msg.get('tokens'),
+                msg.get('model'),
+                json.dumps(msg['metadata']) if msg.get('metadata') else None
+            )
+            for message_id, msg in zip(message_ids, messages)
+        ])
+        
+        # Only fill the previews that are not set yet, i.e. when these are the first
+        # messages of that role in the conversation
+        cursor.execute('''
+        UPDATE conversations
+        SET first_user_message = COALESCE(first_user_message, ?),
+            first_assistant_message = COALESCE(first_assistant_message, ?),
+            updated_at = datetime('now')
+        WHERE id = ?
+        ''', (first_user_message, first_assistant_message, conversation_id))
+        
+        if conn is None:
+            db_conn.commit()
+    
+    return message_ids
+
+
+def get_conversation(conversation_id: str, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
     """
     Get a conversation by ID, including all its messages.
     
     Args:
         conversation_id: The ID of the conversation
+        conn: Optional open connection to reuse
         
     Returns:
         Dict: The conversation with its messages
     """
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+    with use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
         
         # Get conversation details
         cursor.execute('SELECT * FROM conversations WHERE id = ?', (conversation_id,))
@@ -225,7 +329,8 @@ def get_conversation(conversation_id: str) -> Dict[str, Any]:
             conversation['metadata'] = json.loads(conversation['metadata'])
         
         # Get all messages for this conversation
-        cursor.execute('SELECT * FROM messages WHERE conversation_id = ? ORDER BY created_at', (conversation_id,))
+        # created_at has second resolution, so ties fall back to insertion order
+        cursor.execute('SELECT * FROM messages WHERE conversation_id = ? ORDER BY created_at, rowid', (conversation_id,))
         message_rows = cursor.fetchall()
         
         messages = []
@@ -240,7 +345,8 @@ def get_conversation(conversation_id: str) -> Dict[str, Any]:
         return conversation
 
 
-def get_all_conversations(user_id: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+def get_all_conversations(user_id: Optional[str] = None, limit: int = 100, offset: int = 0,
+                          conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, Any]]:
     """
     Get all conversations, optionally filtered by user_id.
     
@@ -248,12 +354,13 @@ def get_all_conversations(user_id: Optional[str] = None, limit: int = 100, offse
         user_id: Optional user identifier to filter by
         limit: Maximum number of conversations to return
         offset: Offset for pagination
+        conn: Optional open connection to reuse
         
     Returns:
         List[Dict]: List of conversations
     """
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+    with use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
         
         query = '''
         SELECT c.*, COUNT(m.id) as message_count
@@ -282,23 +389,80 @@ def get_all_conversations(user_id: Optional[str] = None, limit: int = 100, offse
         return conversations
 
 
-def delete_conversation(conversation_id: str) -> bool:
+def get_conversation_summary(conversation_id: str, message_count: int, digest: str,
+                             conn: Optional[sqlite3.Connection] = None) -> Optional[str]:
+    """
+    Get the stored summary of the first messages of a conversation.
+    
+    Args:
+        conversation_id: The ID of the conversation
+        message_count: Number of leading messages the summary must cover
+        digest: Digest of those messages; a summary of since-edited messages is not returned
+        conn: Optional open connection to reuse
+        
+    Returns:
+        Optional[str]: The summary, or None if none has been stored for those messages
+    """
+    with use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
+        
+        cursor.execute('''
+        SELECT content FROM conversation_summaries
+        WHERE conversation_id = ? AND message_count = ? AND digest = ?
+        ''', (conversation_id, message_count, digest))
+        
+        row = cursor.fetchone()
+        return row['content'] if row else None
+
+
+def save_conversation_summary(conversation_id: str, message_count: int, digest: str, content: str,
+                              conn: Optional[sqlite3.Connection] = None) -> None:
+    """
+    Store a summary of the first messages of a conversation, replacing any earlier one.
+    
+    Args:
+        conversation_id: The ID of the conversation
+        message_count: Number of leading messages the summary covers
+        digest: Digest of the summarized messages
+        content: The summary text
+        conn: Optional open connection to reuse; the caller is then responsible for committing
+    """
+    with use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
+        
+        cursor.execute('''
+        INSERT INTO conversation_summaries (conversation_id, message_count, digest, content, created_at)
+        VALUES (?, ?, ?, ?, datetime('now'))
+        ON CONFLICT (conversation_id) DO UPDATE SET
+            message_count = excluded.message_count,
+            digest = excluded.digest,
+            content = excluded.content,
+            created_at = excluded.created_at
+        ''', (conversation_id, message_count, digest, content))
+        
+        if conn is None:
+            db_conn.commit()
+
+
+def delete_conversation(conversation_id: str, conn: Optional[sqlite3.Connection] = None) -> bool:
     """
     Delete a conversation and all its messages.
     
     Args:
         conversation_id: The ID of the conversation to delete
+        conn: Optional open connection to reuse; the caller is then responsible for committing
         
     Returns:
         bool: True if the conversation was deleted, False otherwise
     """
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+    with use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
         
         cursor.execute('DELETE FROM conversations WHERE id = ?', (conversation_id,))
         
         deleted = cursor.rowcount > 0
-        conn.commit()
+        if conn is None:
+            db_conn.commit()
         
         return deleted
 
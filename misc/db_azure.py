@@ -21,7 +21,8 @@ load_dotenv()
 
 
 def create_conversation(title: str, model: str, system_prompt: Optional[str] = None, 
-                       user_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> str:
+                       user_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None,
+                       conn=None) -> str:
     """
     Create a new conversation in Azure SQL database.
     
@@ -31,14 +32,15 @@ def create_conversation(title: str, model: str, system_prompt: Optional[str] = N
         system_prompt: Optional system prompt for the conversation
         user_id: Optional user identifier
         metadata: Optional metadata as a dictionary
+        conn: Optional open connection to reuse; the caller is then responsible for committing
         
     Returns:
         str: The ID of the created conversation
     """
     conversation_id = str(uuid.uuid4())
     
-    with db_wrapper.get_connection() as conn:
-        cursor = conn.cursor()
+    with db_wrapper.use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
         
         # Adapt query for Azure SQL
         query = """
@@ -56,14 +58,16 @@ def create_conversation(title: str, model: str, system_prompt: Optional[str] = N
             json.dumps(metadata) if metadata else None
         ))
         
-        conn.commit()
+        if conn is None:
+            db_conn.commit()
     
     return conversation_id
 
 
 def add_message(conversation_id: str, role: str, content: str, 
                tokens: Optional[int] = None, model: Optional[str] = None,
-               metadata: Optional[Dict[str, Any]] = None) -> str:
+               metadata: Optional[Dict[str, Any]] = None,
+               conn=None) -> str:
     """
     Add a message to a conversation in Azure SQL database.
     
@@ -74,14 +78,15 @@ def add_message(conversation_id: str, role: str, content: str,
         tokens: Optional token count
         model: Optional model used for this specific message
         metadata: Optional metadata as a dictionary
+        conn: Optional open connection to reuse; the caller is then responsible for committing
         
     Returns:
         str: The ID of the created message
     """
     message_id = str(uuid.uuid4())
     
-    with db_wrapper.get_connection() as conn:
-        cursor = conn.cursor()
+    with db_wrapper.use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
         
         # Insert the message
         cursor.execute("""
@@ -151,23 +156,25 @@ def add_message(conversation_id: str, role: str, content: str,
             WHERE id = ?
             """, (conversation_id,))
         
-        conn.commit()
+        if conn is None:
+            db_conn.commit()
     
     return message_id
 
 
-def get_conversation(conversation_id: str) -> Dict[str, Any]:
+def get_conversation(conversation_id: str, conn=None) -> Dict[str, Any]:
     """
     Get a conversation by ID from Azure SQL, including all its messages.
     
     Args:
         conversation_id: The ID of the conversation
+        conn: Optional open connection to reuse
         
     Returns:
         Dict: The conversation with its messages
     """
-    with db_wrapper.get_connection() as conn:
-        cursor = conn.cursor()
+    with db_wrapper.use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
         
         # Get conversation details
         cursor.execute('SELECT * FROM conversations WHERE id = ?', (conversation_id,))
@@ -203,7 +210,8 @@ def get_conversation(conversation_id: str) -> Dict[str, Any]:
         return conversation
 
 
-def get_all_conversations(user_id: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+def get_all_conversations(user_id: Optional[str] = None, limit: int = 100, offset: int = 0,
+                          conn=None) -> List[Dict[str, Any]]:
     """
     Get all conversations from Azure SQL, optionally filtered by user_id.
     
@@ -211,12 +219,13 @@ def get_all_conversations(user_id: Optional[str] = None, limit: int = 100, offse
         user_id: Optional user identifier to filter by
         limit: Maximum number of conversations to return
         offset: Offset for pagination
+        conn: Optional open connection to reuse
         
     Returns:
         List[Dict]: List of conversations
     """
-    with db_wrapper.get_connection() as conn:
-        cursor = conn.cursor()
+    with db_wrapper.use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
         
         query = """
         SELECT c.*, (SELECT COUNT(*) FROM messages m WHERE m.conversation_id = c.id) as message_count
@@ -247,22 +256,24 @@ def get_all_conversations(user_id: Optional[str] = None, limit: int = 100, offse
         return conversations
 
 
-def delete_conversation(conversation_id: str) -> bool:
+def delete_conversation(conversation_id: str, conn=None) -> bool:
     """
     Delete a conversation and all its messages from Azure SQL.
     
     Args:
         conversation_id: The ID of the conversation to delete
+        conn: Optional open connection to reuse; the caller is then responsible for committing
         
     Returns:
         bool: True if the conversation was deleted, False otherwise
     """
-    with db_wrapper.get_connection() as conn:
-        cursor = conn.cursor()
+    with db_wrapper.use_connection(conn) as db_conn:
+        cursor = db_conn.cursor()
         
         cursor.execute('DELETE FROM conversations WHERE id = ?', (conversation_id,))
         
         deleted = cursor.rowcount > 0
-        conn.commit()
+        if conn is None:
+            db_conn.commit()
         
         return deleted
@@ -122,6 +122,23 @@ class DatabaseWrapper:
         else:
             raise ValueError(f"Unsupported database type: {self.db_type}")
     
+    @contextmanager
+    def use_connection(self, conn=None):
+        """
+        Context manager that reuses an existing connection or opens a new one.
+        
+        Args:
+            conn: Optional open connection owned by the caller
+            
+        Yields:
+            Connection: The given connection, or a new one that is closed on exit
+        """
+        if conn is not None:
+            yield conn
+        else:
+            with self.get_connection() as new_conn:
+                yield new_conn
+    
     def execute_query(self, query, params=None):
         """
         Execute a query and return all results.
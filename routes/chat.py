@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import StreamingResponse
-from typing import Dict, List, Generator
-import json
+from typing import Dict, List, AsyncGenerator
+import orjson
 import asyncio
 from sqlalchemy.orm import Session
 
@@ -15,12 +15,26 @@ from schema.chat import ChatRequest, ChatStreamResponse
 
 router = APIRouter()
 
+
+def _sse(payload: Dict) -> bytes:
+    """
+    Encode a payload as an SSE data frame.
+    
+    Args:
+        payload: The event data to serialize
+        
+    Returns:
+        The SSE formatted frame as bytes
+    """
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
 async def stream_generator(
     model: str,
     messages: List[Dict[str, str]],
     conversation_id: str,
     db: Session
-) -> Generator[str, None, None]:
+) -> AsyncGenerator[bytes, None]:
     """
     Generate a stream of SSE events from the chat completion.
     
@@ -28,30 +42,33 @@ async def stream_generator(
         model: The model to use for the chat completion
         messages: The messages to send to the model
         conversation_id: The ID of the conversation
+        db: The request's database session, used to save the assistant's response
         
     Yields:
         SSE formatted response chunks
     """
-    # Initialize variables to collect the full response
-    full_content = ""
+    # Collect response chunks and join them once at the end
+    content_parts: List[str] = []
     
     try:
         # Get the streaming response from the LLM service
         for chunk in llm_service.stream_chat(model=model, messages=messages):
             # Extract content from the chunk (this may vary depending on the provider)
-            if hasattr(chunk, 'choices') and len(chunk.choices) > 0:
+            choices = getattr(chunk, 'choices', None)
+            if choices:
                 # OpenAI format
-                delta = chunk.choices[0].delta
-                content = delta.content if hasattr(delta, 'content') and delta.content else ""
-            elif hasattr(chunk, 'delta') and hasattr(chunk.delta, 'text'):
-                # Anthropic format
-                content = chunk.delta.text if chunk.delta.text else ""
+                content = getattr(choices[0].delta, 'content', None) or ""
             else:
-                # Try to extract content from other formats or use empty string
-                content = getattr(chunk, 'content', '')
+                # Anthropic format, then other formats with a content attribute, else empty string
+                content = (
+                    getattr(getattr(chunk, 'delta', None), 'text', None)
+                    or getattr(chunk, 'content', None)
+                    or ""
+                )
             
-            # Append to the full content
-            full_content += content if content else ""
+            # Append to the collected content
+            if content:
+                content_parts.append(content)
             
             # Prepare the SSE event data using the Pydantic model
             response = ChatStreamResponse(
@@ -60,28 +77,29 @@ async def stream_generator(
             )
             
             # Yield the SSE formatted event
-            yield f"data: {json.dumps(response.model_dump())}\n\n"
+            yield _sse(response.model_dump())
             
             # Small delay to prevent overwhelming the client
             await asyncio.sleep(0.01)
         
-        # Send a final event indicating completion
-        response = ChatStreamResponse(
-            content="",
-            done=True,
-            conversation_id=conversation_id
-        )
-        yield f"data: {json.dumps(response.model_dump())}\n\n"
-        
-        # Save the assistant's response to the database
+        # Save the assistant's response before signalling completion, so a client that
+        # fetches the conversation after the final event sees the reply
         add_message(
             db=db,
             conversation_id=conversation_id,
             role="assistant",
-            content=full_content,
+            content="".join(content_parts),
             model=model
         )
         
+        # Send a final event indicating completion
+        response = ChatStreamResponse(
+            content="",
+            done=True,
+            conversation_id=conversation_id
+        )
+        yield _sse(response.model_dump())
+        
     except Exception as e:
         # Send an error event
         error_response = ChatStreamResponse(
@@ -89,7 +107,7 @@ async def stream_generator(
             done=True,
             conversation_id=conversation_id
         )
-        yield f"data: {json.dumps(error_response.model_dump())}\n\n"
+        yield _sse(error_response.model_dump())
 
 
 @router.post("/chat")
@@ -127,7 +145,7 @@ async def chat(request: ChatRequest, db: Session = Depends(get_db)) -> Streaming
     # If no conversation_id is provided, create a new conversation
     if not conversation_id:
         # Create a title from the first user message (truncated if too long)
-        title = user_message[:50] + "..." if len(user_message) > 50 else user_message
+        title = user_message if len(user_message) <= 50 else f"{user_message[:50]}..."
         
         # Create a new conversation
         conversation = create_conversation(
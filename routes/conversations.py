@@ -21,49 +21,9 @@ async def list_conversations(user_id: Optional[str] = None, limit: int = 100, of
     Returns:
         A list of conversation summary objects
     """
-    # Debug: Print parameters
-    print(f"\nlist_conversations called with user_id={user_id}, limit={limit}, offset={offset}")
-    
     conversations = get_all_conversations(db=db, user_id=user_id, limit=limit, skip=offset)
     
-    # Debug: Print conversations
-    print(f"Got {len(conversations)} conversations from get_all_conversations")
-    if conversations:
-        print(f"First conversation type: {type(conversations[0])}")
-        if hasattr(conversations[0], 'to_dict'):
-            print("Has to_dict method")
-        else:
-            print(f"Keys: {conversations[0].keys() if isinstance(conversations[0], dict) else 'Not a dict'}")
-    
-    # Handle both SQLAlchemy models and dictionaries (for tests)
-    result = []
-    for i, conv in enumerate(conversations):
-        try:
-            if hasattr(conv, 'to_dict'):
-                # SQLAlchemy model
-                print(f"Processing SQLAlchemy model {i}")
-                conv_dict = conv.to_dict()
-                # Add message_count field (required by ConversationSummary model)
-                conv_dict["message_count"] = len(conv.messages) if hasattr(conv, 'messages') else 0
-                result.append(ConversationSummary.model_validate(conv_dict))
-            else:
-                # Dictionary (for tests)
-                print(f"Processing dictionary {i}")
-                # Ensure message_count field exists
-                if "message_count" not in conv:
-                    conv["message_count"] = 0
-                # Debug: Print validation attempt
-                print(f"Attempting to validate: {list(conv.keys())}")
-                validated = ConversationSummary.model_validate(conv)
-                print(f"Validation successful for {i}")
-                result.append(validated)
-        except Exception as e:
-            print(f"Error processing conversation {i}: {str(e)}")
-    
-    # Debug: Print result
-    print(f"Returning {len(result)} conversations")
-    
-    return result
+    return [ConversationSummary.model_validate(conv) for conv in conversations]
 
 
 @router.get("/conversations/{conversation_id}", response_model=Conversation)
@@ -84,28 +44,8 @@ async def get_conversation_by_id(conversation_id: str, db: Session = Depends(get
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    # Handle both SQLAlchemy models and dictionaries (for tests)
-    if hasattr(conversation, 'to_dict'):
-        # SQLAlchemy model
-        conv_dict = conversation.to_dict()
-        # Add messages to the dictionary
-        if hasattr(conversation, 'messages'):
-            conv_dict["messages"] = [msg.to_dict() if hasattr(msg, 'to_dict') else msg for msg in conversation.messages]
-            # Add message_count field
-            conv_dict["message_count"] = len(conversation.messages)
-        else:
-            conv_dict["message_count"] = 0
-    else:
-        # Dictionary (for tests)
-        conv_dict = conversation
-        # Ensure messages key exists
-        if "messages" not in conv_dict:
-            conv_dict["messages"] = []
-        # Ensure message_count field exists
-        if "message_count" not in conv_dict:
-            conv_dict["message_count"] = len(conv_dict["messages"])
-    
-    return Conversation.model_validate(conv_dict)
+    # Messages and message_count are read from attributes without an intermediate dict
+    return Conversation.model_validate(conversation)
 
 
 @router.delete("/conversations/{conversation_id}", response_model=DeleteResponse)
@@ -1,10 +1,19 @@
 from fastapi import APIRouter, HTTPException
+from typing import Dict, List
 from llm_service_providers.index import llm_service
 from misc.constants import Provider
 
 router = APIRouter()
 
-@router.get("/models")
+# Lowercase provider name -> Provider value, built once from the Provider constants
+_PROVIDER_LOOKUP = {
+    value.lower(): value
+    for name, value in vars(Provider).items()
+    if not name.startswith("_")
+}
+_VALID_PROVIDERS = ", ".join(_PROVIDER_LOOKUP)
+
+@router.get("/models", response_model=Dict[str, List[str]])
 async def get_available_models():
     """
     Get all available models for chat completion.
@@ -15,7 +24,7 @@ async def get_available_models():
     return llm_service.get_available_models()
 
 
-@router.get("/models/{provider}")
+@router.get("/models/{provider}", response_model=List[str])
 async def get_provider_models(provider: str):
     """
     Get available models for a specific provider.
@@ -30,33 +39,28 @@ async def get_provider_models(provider: str):
         HTTPException: If the provider is not valid or not available
     """
     # Check if the provider is valid
-    if provider.lower() not in ["openai", "anthropic"]:
+    provider_name = _PROVIDER_LOOKUP.get(provider.lower())
+    if provider_name is None:
         raise HTTPException(
             status_code=400, 
-            detail=f"Invalid provider: {provider}. Valid providers are: openai, anthropic"
+            detail=f"Invalid provider: {provider}. Valid providers are: {_VALID_PROVIDERS}"
         )
-        
-    # Get the provider enum value
-    if provider.lower() == "openai":
-        provider_enum = Provider.OPENAI
-    else:  # anthropic
-        provider_enum = Provider.ANTHROPIC
     
     # Get all available models
     available_models = llm_service.get_available_models()
     
     # Check if the provider is available
-    if provider.lower() not in available_models:
+    if provider_name not in available_models:
         raise HTTPException(
             status_code=404,
             detail=f"Provider {provider} is not available. Check your API keys."
         )
     
     # Return the models for the specified provider
-    return available_models[provider.lower()]
+    return available_models[provider_name]
 
 
-@router.get("/models-default")
+@router.get("/models-default", response_model=Dict[str, str])
 async def get_default_models():
     """
     Get the default model for each available provider.
@@ -1,8 +1,13 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, AliasChoices
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 
 
+# ORM models expose parsed metadata as metadata_dict; plain dicts use the metadata key.
+# Only read models validated from ORM objects accept it, not request bodies
+METADATA_ALIASES = AliasChoices("metadata_dict", "metadata")
+
+
 class Message(BaseModel):
     """Pydantic model for a message in a conversation."""
     id: str
@@ -12,7 +17,7 @@ class Message(BaseModel):
     created_at: datetime
     tokens: Optional[int] = None
     model: Optional[str] = None
-    metadata: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = Field(default=None, validation_alias=METADATA_ALIASES)
 
     model_config = ConfigDict(from_attributes=True)  # For compatibility with SQLAlchemy ORM models
 
@@ -49,6 +54,7 @@ class Conversation(ConversationBase):
     first_assistant_message: Optional[str] = None
     messages: List[Message] = []
     message_count: Optional[int] = None
+    metadata: Optional[Dict[str, Any]] = Field(default=None, validation_alias=METADATA_ALIASES)
 
     model_config = ConfigDict(from_attributes=True)  # For compatibility with SQLAlchemy ORM models
 
@@ -64,8 +70,8 @@ class ConversationSummary(BaseModel):
     system_prompt: Optional[str] = None
     first_user_message: Optional[str] = None
     first_assistant_message: Optional[str] = None
-    message_count: int
-    metadata: Optional[Dict[str, Any]] = None
+    message_count: int = 0
+    metadata: Optional[Dict[str, Any]] = Field(default=None, validation_alias=METADATA_ALIASES)
 
     model_config = ConfigDict(from_attributes=True)  # For compatibility with SQLAlchemy ORM models
 
@@ -7,13 +7,14 @@ Creates 5 conversations with 10-20 messages each for a specific user.
 import os
 import sys
 import random
-from datetime import datetime, timedelta
+import argparse
+from datetime import datetime, timedelta, timezone
 import uuid
 
 # Add the parent directory to the path so we can import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from misc.db import create_conversation, add_message, get_db_connection
+from misc.db import get_db_connection
 
 # Constants
 USER_ID = "usr_123456789"
@@ -22,47 +23,57 @@ MIN_MESSAGES = 10
 MAX_MESSAGES = 20
 MODELS = ["gpt-4o-mini", "gpt-4o", "claude-3-5-haiku-20241022"]
 
-# Sample conversation topics with initial user messages and system prompts
-CONVERSATION_TOPICS = [
-    {
-        "title": "Learning Python Programming",
-        "system_prompt": "You are a helpful programming tutor specializing in Python.",
-        "first_message": "I want to learn Python programming. Where should I start?"
-    },
-    {
-        "title": "Travel Planning for Japan",
-        "system_prompt": "You are a travel advisor with expertise in Japanese culture and tourism.",
-        "first_message": "I'm planning a trip to Japan next month. What are the must-visit places in Tokyo?"
-    },
-    {
-        "title": "Healthy Meal Prep Ideas",
-        "system_prompt": "You are a nutritionist specializing in healthy meal preparation.",
-        "first_message": "I need some healthy meal prep ideas for a busy work week."
-    },
-    {
-        "title": "Book Recommendations",
-        "system_prompt": "You are a literary expert with knowledge of books across all genres.",
-        "first_message": "Can you recommend some good science fiction books for someone who enjoyed 'Dune'?"
-    },
-    {
-        "title": "Home Workout Routines",
-        "system_prompt": "You are a fitness coach specializing in home workouts.",
-        "first_message": "I want to start working out at home. What are some good routines for beginners?"
-    },
-    {
-        "title": "Learning to Play Guitar",
-        "system_prompt": "You are a guitar teacher with experience teaching beginners.",
-        "first_message": "I just got my first guitar. How should I start learning to play?"
-    },
-    {
-        "title": "Gardening Tips for Beginners",
-        "system_prompt": "You are a gardening expert with knowledge of plants and gardening techniques.",
-        "first_message": "I want to start a small vegetable garden. What are some easy vegetables to grow for beginners?"
-    }
-]
+# Insert statements, prepared once and reused for every conversation
+INSERT_CONVERSATION_SQL = """
+INSERT INTO conversations (id, title, created_at, updated_at, user_id, model, system_prompt, first_user_message, first_assistant_message)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_MESSAGE_SQL = """
+INSERT INTO messages (id, conversation_id, role, content, created_at, model)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Sample conversation topics as (title, system_prompt, first_message)
+CONVERSATION_TOPICS = (
+    (
+        "Learning Python Programming",
+        "You are a helpful programming tutor specializing in Python.",
+        "I want to learn Python programming. Where should I start?"
+    ),
+    (
+        "Travel Planning for Japan",
+        "You are a travel advisor with expertise in Japanese culture and tourism.",
+        "I'm planning a trip to Japan next month. What are the must-visit places in Tokyo?"
+    ),
+    (
+        "Healthy Meal Prep Ideas",
+        "You are a nutritionist specializing in healthy meal preparation.",
+        "I need some healthy meal prep ideas for a busy work week."
+    ),
+    (
+        "Book Recommendations",
+        "You are a literary expert with knowledge of books across all genres.",
+        "Can you recommend some good science fiction books for someone who enjoyed 'Dune'?"
+    ),
+    (
+        "Home Workout Routines",
+        "You are a fitness coach specializing in home workouts.",
+        "I want to start working out at home. What are some good routines for beginners?"
+    ),
+    (
+        "Learning to Play Guitar",
+        "You are a guitar teacher with experience teaching beginners.",
+        "I just got my first guitar. How should I start learning to play?"
+    ),
+    (
+        "Gardening Tips for Beginners",
+        "You are a gardening expert with knowledge of plants and gardening techniques.",
+        "I want to start a small vegetable garden. What are some easy vegetables to grow for beginners?"
+    )
+)
 
 # Sample message pairs (user question followed by assistant response)
-MESSAGE_PAIRS = [
+MESSAGE_PAIRS = (
     # Python conversation
     (
         "How do I install Python on my computer?",
@@ -160,125 +171,199 @@ MESSAGE_PAIRS = [
         "How often should I water my vegetable garden?",
         "Most vegetable gardens need about 1-1.5 inches of water per week, either from rainfall or irrigation. Rather than frequent shallow watering, aim for fewer deep waterings that encourage roots to grow deeper. Generally, watering deeply 2-3 times per week is better than daily light watering. Use the finger test—insert your finger 2 inches into the soil; if it feels dry, it's time to water. Morning watering is best as it reduces evaporation and fungal disease risk. Adjust based on weather conditions, soil type, and specific plant needs."
     )
-]
+)
 
-def generate_sample_data():
-    """Generate sample conversations and messages in the database."""
-    print("Generating sample conversation data...")
+def format_timestamp(value: datetime) -> str:
+    """Format a datetime the same way as SQLite's datetime('now')."""
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class LCGRandom:
+    """
+    Deterministic linear congruential generator with the subset of the random
+    module API used by this script.
     
-    # Clear existing data for this user
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Get existing conversation IDs for this user
-        cursor.execute("SELECT id FROM conversations WHERE user_id = ?", (USER_ID,))
-        existing_conversations = cursor.fetchall()
+    It is much cheaper per call than the Mersenne Twister behind random and always
+    produces the same data for the same seed, which is all sample data needs.
+    """
+    
+    def __init__(self, seed: int = 0xDEADBEEF):
+        self.state = seed & 0x7fffffff
+    
+    def next(self) -> int:
+        """Advance the generator and return the new 31-bit state."""
+        self.state = (self.state * 1103515245 + 12345) & 0x7fffffff
+        return self.state
+    
+    def below(self, n: int) -> int:
+        """Return an integer in [0, n), using the high bits since the low bits of an LCG cycle quickly."""
+        return (self.next() >> 16) % n
+    
+    def randint(self, a: int, b: int) -> int:
+        """Return an integer N such that a <= N <= b."""
+        return a + self.below(b - a + 1)
+    
+    def choice(self, seq):
+        """Return one element of a non-empty sequence."""
+        return seq[self.below(len(seq))]
+    
+    def choices(self, population, k: int = 1):
+        """Return k elements chosen with replacement."""
+        n = len(population)
+        return [population[self.below(n)] for _ in range(k)]
+    
+    def sample(self, population, k: int):
+        """Return k distinct elements using a partial Fisher-Yates shuffle."""
+        pool = list(population)
+        n = len(pool)
+        for i in range(k):
+            j = i + self.below(n - i)
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[:k]
+
+
+def iter_message_rows(conversation_id, start, conversation_messages):
+    """
+    Yield message rows one at a time so executemany never needs them all in memory.
+    
+    Args:
+        conversation_id: The ID of the conversation the messages belong to
+        start: Conversation timestamp; messages follow it one second apart
+        conversation_messages: (role, content, model) tuples in conversation order
         
-        # Delete existing conversations
-        if existing_conversations:
-            for conv in existing_conversations:
-                cursor.execute("DELETE FROM messages WHERE conversation_id = ?", (conv[0],))
-                cursor.execute("DELETE FROM conversations WHERE id = ?", (conv[0],))
-            
-            conn.commit()
-            print(f"Cleared {len(existing_conversations)} existing conversations for user {USER_ID}")
+    Yields:
+        tuple: (id, conversation_id, role, content, created_at, model) for each message
+    """
+    for offset, (role, content, model) in enumerate(conversation_messages, start=1):
+        yield (
+            str(uuid.uuid4()),
+            conversation_id,
+            role,
+            content,
+            format_timestamp(start + timedelta(seconds=offset)),
+            model
+        )
+
+
+def generate_sample_data(rng=random):
+    """
+    Generate sample conversations and messages in the database.
     
-    # Sample conversation topics
-    topics = random.sample(CONVERSATION_TOPICS, NUM_CONVERSATIONS)
+    Args:
+        rng: Source of randomness; the random module by default, or an LCGRandom
+    """
+    print("Generating sample conversation data...")
     
-    # Create conversations
-    total_messages = 0
-    for i, topic in enumerate(topics):
-        # Create the conversation
-        conversation_id = create_conversation(
-            title=topic["title"],
-            model=random.choice(MODELS),
-            system_prompt=topic["system_prompt"],
-            user_id=USER_ID
+    # Use one connection for the whole run and commit once per conversation, so
+    # memory stays bounded by a single conversation while SQLite syncs only a few times
+    with get_db_connection() as conn:
+        conn.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA temp_store=MEMORY;")
+        conn.execute("BEGIN IMMEDIATE")
+        
+        # Clear existing data for this user with two set-based deletes
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM messages WHERE conversation_id IN (SELECT id FROM conversations WHERE user_id = ?)",
+            (USER_ID,)
         )
+        deleted_messages = cursor.rowcount
+        cursor.execute("DELETE FROM conversations WHERE user_id = ?", (USER_ID,))
+        deleted_conversations = cursor.rowcount
         
-        print(f"Created conversation {i+1}/{NUM_CONVERSATIONS}: {topic['title']}")
+        if deleted_conversations > 0:
+            print(f"Cleared {deleted_conversations} existing conversations and {deleted_messages} messages for user {USER_ID}")
         
-        # Determine number of message pairs for this conversation (each pair is user + assistant)
-        # We want between MIN_MESSAGES and MAX_MESSAGES total messages
-        # So divide by 2 for pairs, but ensure we have an odd number to end with assistant
-        num_pairs = random.randint(MIN_MESSAGES // 2, MAX_MESSAGES // 2)
+        # Sample conversation topics
+        topics = rng.sample(CONVERSATION_TOPICS, NUM_CONVERSATIONS)
         
-        # Add the first user message
-        add_message(
-            conversation_id=conversation_id,
-            role="user",
-            content=topic["first_message"],
-            model=None
-        )
+        # Draw every model pick up front; this is an upper bound on the picks needed
+        # (at most one per message plus one per conversation)
+        model_stream = iter(rng.choices(MODELS, k=NUM_CONVERSATIONS * MAX_MESSAGES + NUM_CONVERSATIONS))
         
-        # Add first assistant response
-        add_message(
-            conversation_id=conversation_id,
-            role="assistant",
-            content=f"I'd be happy to help you with {topic['title'].lower()}! {random.choice(MESSAGE_PAIRS)[1]}",
-            model=random.choice(MODELS)
-        )
+        # Messages get increasing timestamps so they keep their order when sorted by created_at
+        timestamp = datetime.now(timezone.utc)
         
-        # Add additional message pairs
-        used_pairs = set()
-        for j in range(num_pairs - 1):  # -1 because we already added the first pair
-            # Select a message pair that hasn't been used yet
-            available_pairs = [(idx, pair) for idx, pair in enumerate(MESSAGE_PAIRS) if idx not in used_pairs]
-            if not available_pairs:  # If all pairs have been used, reset
-                used_pairs = set()
-                available_pairs = [(idx, pair) for idx, pair in enumerate(MESSAGE_PAIRS)]
+        # Create conversations
+        total_messages = 0
+        for i, (title, system_prompt, first_message) in enumerate(topics):
+            conversation_id = str(uuid.uuid4())
+            lower_title = title.lower()
+            created_at = format_timestamp(timestamp)
             
-            pair_idx, (user_msg, assistant_msg) = random.choice(available_pairs)
-            used_pairs.add(pair_idx)
+            # (role, content, model) for each message in this conversation
+            conversation_messages = []
             
-            # Add user message
-            add_message(
-                conversation_id=conversation_id,
-                role="user",
-                content=user_msg,
-                model=None
-            )
+            print(f"Created conversation {i+1}/{NUM_CONVERSATIONS}: {title}")
             
-            # Add assistant response
-            add_message(
-                conversation_id=conversation_id,
-                role="assistant",
-                content=assistant_msg,
-                model=random.choice(MODELS)
-            )
-        
-        # Check if the last message is from the user, and if so, add an assistant response
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT role FROM messages WHERE conversation_id = ? ORDER BY created_at DESC LIMIT 1",
-                (conversation_id,)
-            )
-            last_role = cursor.fetchone()[0]
+            # Determine number of message pairs for this conversation (each pair is user + assistant)
+            # We want between MIN_MESSAGES and MAX_MESSAGES total messages
+            # So divide by 2 for pairs, but ensure we have an odd number to end with assistant
+            num_pairs = rng.randint(MIN_MESSAGES // 2, MAX_MESSAGES // 2)
             
-            if last_role == "user":
-                # Add a final assistant response
-                add_message(
-                    conversation_id=conversation_id,
-                    role="assistant",
-                    content="I hope that helps! Let me know if you have any other questions about " + topic["title"].lower() + ".",
-                    model=random.choice(MODELS)
-                )
-                print(f"  Added a final assistant message to ensure assistant has the last word")
-        
-        # Count the total messages in this conversation
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT COUNT(*) FROM messages WHERE conversation_id = ?",
-                (conversation_id,)
+            # Add the first user message
+            conversation_messages.append(("user", first_message, None))
+            
+            # Add first assistant response
+            conversation_messages.append((
+                "assistant",
+                f"I'd be happy to help you with {lower_title}! {rng.choice(MESSAGE_PAIRS)[1]}",
+                next(model_stream)
+            ))
+            
+            # Pick distinct message pairs up front, starting a new round if they run out
+            num_extra_pairs = num_pairs - 1  # -1 because we already added the first pair
+            pair_indices = []
+            while len(pair_indices) < num_extra_pairs:
+                k = min(num_extra_pairs - len(pair_indices), len(MESSAGE_PAIRS))
+                pair_indices.extend(rng.sample(range(len(MESSAGE_PAIRS)), k=k))
+            
+            # Add additional message pairs
+            for pair_idx in pair_indices:
+                user_msg, assistant_msg = MESSAGE_PAIRS[pair_idx]
+                
+                # Add user message and assistant response
+                conversation_messages.append(("user", user_msg, None))
+                conversation_messages.append(("assistant", assistant_msg, next(model_stream)))
+            
+            # Messages are one second apart, starting one second after the conversation
+            messages_start = timestamp
+            timestamp += timedelta(seconds=len(conversation_messages))
+            
+            # Preview columns are normally maintained by add_message; fill them in directly
+            first_user_message = next(content for role, content, _ in conversation_messages if role == "user")
+            first_assistant_message = next(content for role, content, _ in conversation_messages if role == "assistant")
+            
+            # Write the conversation before its messages, then commit them together;
+            # the first commit also covers the cleanup above
+            conn.execute(INSERT_CONVERSATION_SQL, (
+                conversation_id,
+                title,
+                created_at,
+                format_timestamp(timestamp),
+                USER_ID,
+                next(model_stream),
+                system_prompt,
+                first_user_message[:100],
+                first_assistant_message[:100]
+            ))
+            conn.executemany(
+                INSERT_MESSAGE_SQL,
+                iter_message_rows(conversation_id, messages_start, conversation_messages)
             )
-            conversation_message_count = cursor.fetchone()[0]
+            conn.commit()
+            
+            conversation_message_count = len(conversation_messages)
             total_messages += conversation_message_count
             print(f"  Added {conversation_message_count} messages to conversation")
+            
+            timestamp += timedelta(seconds=1)
     
     print(f"Successfully generated {NUM_CONVERSATIONS} sample conversations with {total_messages} total messages")
 
 if __name__ == "__main__":
-    generate_sample_data()
+    parser = argparse.ArgumentParser(description="Generate sample conversation data")
+    parser.add_argument("--fast-random", action="store_true",
+                        help="Use a fast deterministic generator instead of the random module")
+    args = parser.parse_args()
+    
+    generate_sample_data(LCGRandom() if args.fast_random else random)
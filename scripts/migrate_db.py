@@ -31,7 +31,9 @@ def migrate_database(db_type=None):
     print(f"Starting database migration for {db.db_type} database")
     
     # Check if the columns already exist
-    if db.column_exists('conversations', 'first_user_message') and db.column_exists('conversations', 'first_assistant_message'):
+    has_user_column = db.column_exists('conversations', 'first_user_message')
+    has_assistant_column = db.column_exists('conversations', 'first_assistant_message')
+    if has_user_column and has_assistant_column:
         print("Columns already exist, no migration needed.")
         return
     
@@ -39,156 +41,119 @@ def migrate_database(db_type=None):
         cursor = conn.cursor()
         
         if db.db_type == "sqlite":
-            # SQLite migration approach - create new table and swap
-            print("Creating temporary table...")
-            # Create a temporary table with the new schema
-            cursor.execute('''
-            CREATE TABLE conversations_new (
-                id TEXT PRIMARY KEY,
-                title TEXT NOT NULL,
-                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                user_id TEXT,
-                model TEXT NOT NULL,
-                system_prompt TEXT,
-                first_user_message TEXT,
-                first_assistant_message TEXT,
-                metadata TEXT
+            # The migration can simply be re-run if interrupted, so trade crash safety
+            # for speed: no fsyncs, an in-memory rollback journal and a large page cache.
+            # journal_mode persists in the database file, so remember it to restore later
+            previous_journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+            previous_synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+            cursor.executescript(
+                "PRAGMA synchronous=OFF; PRAGMA journal_mode=MEMORY; "
+                "PRAGMA temp_store=MEMORY; PRAGMA cache_size=-200000;"
             )
-            ''')
             
-            # Copy data from the old table to the new one
-            print("Copying data to new table...")
-            cursor.execute('''
-            INSERT INTO conversations_new (id, title, created_at, updated_at, user_id, model, system_prompt, metadata)
-            SELECT id, title, created_at, updated_at, user_id, model, system_prompt, metadata FROM conversations
-            ''')
-            
-            # Find and populate the first user and assistant messages
-            print("Finding first messages for each conversation...")
-            cursor.execute('''
-            SELECT DISTINCT conversation_id FROM messages
-            ''')
-            conversation_ids = [row[0] for row in cursor.fetchall()]
-            
-            for conversation_id in conversation_ids:
-                # Find first user message
+            # Run the whole migration, DDL included, as a single transaction
+            cursor.execute("BEGIN")
+        
+        try:
+            # Index the first-message lookups (conversation, role, earliest first) so they
+            # are index range scans instead of filtered scans plus a sort
+            print("Creating index on messages (conversation_id, role, created_at)...")
+            if db.db_type == "sqlite":
                 cursor.execute('''
-                SELECT content FROM messages
-                WHERE conversation_id = ? AND role = 'user'
-                ORDER BY created_at ASC
-                LIMIT 1
-                ''', (conversation_id,))
-                first_user_row = cursor.fetchone()
-                
-                # Find first assistant message
+                CREATE INDEX IF NOT EXISTS idx_msg_conv_role_time
+                ON messages (conversation_id, role, created_at)
+                ''')
+            elif db.db_type == "azure_sql":
                 cursor.execute('''
-                SELECT content FROM messages
-                WHERE conversation_id = ? AND role = 'assistant'
-                ORDER BY created_at ASC
-                LIMIT 1
-                ''', (conversation_id,))
-                first_assistant_row = cursor.fetchone()
+                IF NOT EXISTS (
+                    SELECT 1 FROM sys.indexes
+                    WHERE name = 'idx_msg_conv_role_time' AND object_id = OBJECT_ID('messages')
+                )
+                CREATE INDEX idx_msg_conv_role_time ON messages (conversation_id, role, created_at)
+                ''')
+            
+            if db.db_type == "sqlite":
+                # SQLite migration approach - add the columns in place rather than
+                # rebuilding the table, so only the new columns' pages are written
+                print("Adding new columns to conversations table...")
                 
-                # Update the new table with the first messages
-                if first_user_row:
-                    first_user_message = first_user_row[0][:100]  # Truncate to 100 chars
+                # Check if first_user_message column exists
+                if not has_user_column:
                     cursor.execute('''
-                    UPDATE conversations_new
-                    SET first_user_message = ?
-                    WHERE id = ?
-                    ''', (first_user_message, conversation_id))
+                    ALTER TABLE conversations
+                    ADD COLUMN first_user_message TEXT
+                    ''')
                 
-                if first_assistant_row:
-                    first_assistant_message = first_assistant_row[0][:100]  # Truncate to 100 chars
+                # Check if first_assistant_message column exists
+                if not has_assistant_column:
                     cursor.execute('''
-                    UPDATE conversations_new
-                    SET first_assistant_message = ?
-                    WHERE id = ?
-                    ''', (first_assistant_message, conversation_id))
-            
-            # Replace the old table with the new one
-            print("Replacing old table with new table...")
-            cursor.execute('DROP TABLE conversations')
-            cursor.execute('ALTER TABLE conversations_new RENAME TO conversations')
-            
-        elif db.db_type == "azure_sql":
-            # Azure SQL migration approach - alter table
-            print("Adding new columns to conversations table...")
-            
-            # Check if first_user_message column exists
-            if not db.column_exists('conversations', 'first_user_message'):
-                cursor.execute('''
-                ALTER TABLE conversations
-                ADD first_user_message NVARCHAR(100) NULL
-                ''')
-            
-            # Check if first_assistant_message column exists
-            if not db.column_exists('conversations', 'first_assistant_message'):
+                    ALTER TABLE conversations
+                    ADD COLUMN first_assistant_message TEXT
+                    ''')
+                
+                # Populate the first user and assistant messages for all conversations at once
+                print("Populating first messages for each conversation...")
                 cursor.execute('''
-                ALTER TABLE conversations
-                ADD first_assistant_message NVARCHAR(100) NULL
+                UPDATE conversations
+                SET
+                    first_user_message = (
+                        SELECT substr(m.content, 1, 100) FROM messages m
+                        WHERE m.conversation_id = conversations.id AND m.role = 'user'
+                        ORDER BY m.created_at ASC
+                        LIMIT 1
+                    ),
+                    first_assistant_message = (
+                        SELECT substr(m.content, 1, 100) FROM messages m
+                        WHERE m.conversation_id = conversations.id AND m.role = 'assistant'
+                        ORDER BY m.created_at ASC
+                        LIMIT 1
+                    )
                 ''')
-            
-            # Find and populate the first user and assistant messages
-            print("Finding first messages for each conversation...")
-            cursor.execute('''
-            SELECT DISTINCT conversation_id FROM messages
-            ''')
-            rows = cursor.fetchall()
-            
-            # Extract conversation IDs based on database type
-            if db.db_type == "sqlite":
-                conversation_ids = [row[0] for row in rows]
-            else:
-                conversation_ids = [row.conversation_id for row in rows]
-            
-            for conversation_id in conversation_ids:
-                # Find first user message
-                cursor.execute('''
-                SELECT TOP 1 content FROM messages
-                WHERE conversation_id = ? AND role = 'user'
-                ORDER BY created_at ASC
-                ''', (conversation_id,))
-                first_user_row = cursor.fetchone()
                 
-                # Find first assistant message
-                cursor.execute('''
-                SELECT TOP 1 content FROM messages
-                WHERE conversation_id = ? AND role = 'assistant'
-                ORDER BY created_at ASC
-                ''', (conversation_id,))
-                first_assistant_row = cursor.fetchone()
+            elif db.db_type == "azure_sql":
+                # Azure SQL migration approach - alter table
+                print("Adding new columns to conversations table...")
                 
-                # Update the table with the first messages
-                if first_user_row:
-                    # Extract content based on database type
-                    if db.db_type == "sqlite":
-                        first_user_message = first_user_row[0][:100]  # Truncate to 100 chars
-                    else:
-                        first_user_message = first_user_row.content[:100]  # Truncate to 100 chars
-                    
+                # Check if first_user_message column exists
+                if not has_user_column:
                     cursor.execute('''
-                    UPDATE conversations
-                    SET first_user_message = ?
-                    WHERE id = ?
-                    ''', (first_user_message, conversation_id))
+                    ALTER TABLE conversations
+                    ADD first_user_message NVARCHAR(100) NULL
+                    ''')
                 
-                if first_assistant_row:
-                    # Extract content based on database type
-                    if db.db_type == "sqlite":
-                        first_assistant_message = first_assistant_row[0][:100]  # Truncate to 100 chars
-                    else:
-                        first_assistant_message = first_assistant_row.content[:100]  # Truncate to 100 chars
-                    
+                # Check if first_assistant_message column exists
+                if not has_assistant_column:
                     cursor.execute('''
-                    UPDATE conversations
-                    SET first_assistant_message = ?
-                    WHERE id = ?
-                    ''', (first_assistant_message, conversation_id))
-        
-        # Commit the changes
-        conn.commit()
+                    ALTER TABLE conversations
+                    ADD first_assistant_message NVARCHAR(100) NULL
+                    ''')
+                
+                # Populate the first user and assistant messages for all conversations at once
+                print("Populating first messages for each conversation...")
+                cursor.execute('''
+                UPDATE conversations
+                SET
+                    first_user_message = (
+                        SELECT TOP 1 LEFT(m.content, 100) FROM messages m
+                        WHERE m.conversation_id = conversations.id AND m.role = 'user'
+                        ORDER BY m.created_at ASC
+                    ),
+                    first_assistant_message = (
+                        SELECT TOP 1 LEFT(m.content, 100) FROM messages m
+                        WHERE m.conversation_id = conversations.id AND m.role = 'assistant'
+                        ORDER BY m.created_at ASC
+                    )
+                ''')
+            
+            # Commit the changes
+            conn.commit()
+        finally:
+            if db.db_type == "sqlite":
+                # Journal mode can only be changed outside a transaction
+                if conn.in_transaction:
+                    conn.rollback()
+                cursor.execute(f"PRAGMA journal_mode={previous_journal_mode}")
+                cursor.execute(f"PRAGMA synchronous={previous_synchronous}")
         
         print("Migration completed successfully!")
 
@@ -12,12 +12,13 @@ Usage:
     python demo_chat_endpoint.py [--host HOST] [--port PORT]
 """
 
-import os
 import sys
-import json
+from pathlib import Path
+import orjson
 import uuid
+import asyncio
 import argparse
-import requests
+import httpx
 import time
 from typing import Dict, Optional, List
 from dotenv import load_dotenv
@@ -26,29 +27,72 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Add the parent directory to the path so we can import our modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tests.demo.token_writer import TokenWriter
+
+# Ask for an event stream explicitly so proxies in between don't buffer the response
+CHAT_REQUEST_HEADERS = {"Content-Type": "application/json", "Accept": "text/event-stream"}
+
+
+# ANSI color codes, precomputed into "{start}{text}{reset}" format strings
+COLORS = {
+    "red": "\033[91m",
+    "green": "\033[92m",
+    "yellow": "\033[93m",
+    "blue": "\033[94m",
+    "magenta": "\033[95m",
+    "cyan": "\033[96m",
+    "reset": "\033[0m",
+    "bold": "\033[1m"
+}
+COLOR_FORMATS = {name: f"{code}{{}}{COLORS['reset']}" for name, code in COLORS.items()}
+
+# Only emit color codes when writing to a terminal
+USE_ANSI = sys.stdout.isatty()
 
 
 def print_colored(text: str, color: str = "reset") -> None:
     """Print text with ANSI color codes."""
-    colors = {
-        "red": "\033[91m",
-        "green": "\033[92m",
-        "yellow": "\033[93m",
-        "blue": "\033[94m",
-        "magenta": "\033[95m",
-        "cyan": "\033[96m",
-        "reset": "\033[0m",
-        "bold": "\033[1m"
-    }
+    if not USE_ANSI:
+        print(text)
+        return
     
-    start_color = colors.get(color.lower(), colors["reset"])
-    end_color = colors["reset"]
+    print(COLOR_FORMATS.get(color.lower(), COLOR_FORMATS["reset"]).format(text))
+
+
+async def iter_sse_data(response: httpx.Response, chunk_size: Optional[int] = None):
+    """
+    Yield the parsed JSON payload of every `data:` line in a server-sent event stream.
+    
+    Raw chunks are accumulated in a byte buffer and split on the blank line that ends
+    each event, so chunks carrying several events (or partial ones) are handled.
+    A `data: [DONE]` sentinel ends the stream without being parsed.
     
-    print(f"{start_color}{text}{end_color}")
+    Args:
+        response: The streaming HTTP response
+        chunk_size: Re-chunk the body into pieces of this size; None (the default) yields
+            each network read as soon as it arrives, up to httpcore's 64 KiB read size.
+            A fixed size would hold tokens back until that many bytes had arrived
+        
+    Yields:
+        dict: The decoded payload of each data line
+    """
+    buf = bytearray()
+    async for chunk in response.aiter_bytes(chunk_size):
+        buf.extend(chunk)
+        while (end := buf.find(b"\n\n")) != -1:
+            event = bytes(buf[:end])
+            del buf[:end + 2]
+            for line in event.split(b"\n"):
+                if line == b"data: [DONE]":
+                    return
+                if line.startswith(b"data: "):
+                    yield orjson.loads(line[6:])
 
 
-def stream_chat(
+async def stream_chat(
+    client: httpx.AsyncClient,
     host: str,
     port: int,
     message: str,
@@ -61,6 +105,7 @@ def stream_chat(
     Send a request to the chat endpoint and display the streaming response.
     
     Args:
+        client: The HTTP client shared across requests
         host: The hostname of the API server
         port: The port of the API server
         message: The message to send to the model
@@ -92,37 +137,41 @@ def stream_chat(
         print_colored("\nSending request to chat endpoint...", "blue")
         start_time = time.time()
         
-        response = requests.post(url, json=payload, stream=True)
-        
-        if response.status_code != 200:
-            print_colored(f"Error: {response.status_code} - {response.text}", "red")
-            return None
-        
-        # Process the streaming response
-        print_colored("\nResponse:", "green")
-        print_colored("=" * 50, "green")
-        
-        full_content = ""
-        returned_conversation_id = None
-        
-        for line in response.iter_lines():
-            if line:
-                line_str = line.decode("utf-8")
-                if line_str.startswith("data: "):
-                    data = json.loads(line_str[6:])
-                    
-                    if data.get("error"):
-                        print_colored(f"Error: {data['error']}", "red")
-                        break
-                    
-                    content = data.get("content", "")
-                    if content:
-                        print(content, end="", flush=True)
-                        full_content += content
-                    
-                    if data.get("done", False):
-                        returned_conversation_id = data.get("conversation_id")
-                        break
+        body = orjson.dumps(payload)
+        async with client.stream("POST", url, content=body, headers=CHAT_REQUEST_HEADERS) as response:
+            if response.status_code != 200:
+                await response.aread()
+                print_colored(f"Error: {response.status_code} - {response.text}", "red")
+                return None
+            
+            # Process the streaming response
+            print_colored("\nResponse:", "green")
+            print_colored("=" * 50, "green")
+            
+            returned_conversation_id = None
+            writer = TokenWriter()
+            
+            async for data in iter_sse_data(response):
+                # Bind the lookup once per event; most events only carry content
+                get = data.get
+                
+                error = get("error")
+                if error:
+                    writer.flush()
+                    print_colored(f"Error: {error}", "red")
+                    break
+                
+                content = get("content")
+                if content:
+                    writer.write(content)
+                
+                # Stop reading at the done event; leaving the `async with` closes the
+                # response right away instead of draining whatever trails it
+                if get("done"):
+                    returned_conversation_id = get("conversation_id")
+                    break
+            
+            writer.flush()
         
         elapsed_time = time.time() - start_time
         print("\n")
@@ -139,24 +188,41 @@ def stream_chat(
     return None
 
 
-def main():
-    """Main function to run the demo."""
+async def amain():
+    """Main coroutine to run the demo."""
     parser = argparse.ArgumentParser(description="Demo for chat endpoint")
     parser.add_argument("--host", type=str, default="localhost", help="API server hostname")
     parser.add_argument("--port", type=int, default=8000, help="API server port")
     parser.add_argument("--system-prompt", type=str, help="Optional system prompt")
+    parser.add_argument("--skip-healthcheck", action="store_true",
+                        help="Don't check that the API server is up before starting")
     
     args = parser.parse_args()
     
+    # One client for the whole session; no timeout since responses stream for a while
+    limits = httpx.Limits(max_connections=4, max_keepalive_connections=4)
+    async with httpx.AsyncClient(timeout=httpx.Timeout(None), limits=limits) as client:
+        await run_demo(client, args)
+
+
+async def run_demo(client: httpx.AsyncClient, args: argparse.Namespace) -> None:
+    """
+    Run the interactive chat loop.
+    
+    Args:
+        client: The HTTP client shared across requests
+        args: Parsed command line arguments
+    """
     # Check if the API server is running
-    try:
-        response = requests.get(f"http://{args.host}:{args.port}/")
-        if response.status_code != 200:
-            print_colored(f"Warning: API server returned status code {response.status_code}", "yellow")
-    except requests.exceptions.ConnectionError:
-        print_colored(f"Error: Could not connect to API server at {args.host}:{args.port}", "red")
-        print_colored("Make sure the server is running with: uvicorn main:app --reload", "yellow")
-        return
+    if not args.skip_healthcheck:
+        try:
+            response = await client.get(f"http://{args.host}:{args.port}/")
+            if response.status_code != 200:
+                print_colored(f"Warning: API server returned status code {response.status_code}", "yellow")
+        except httpx.ConnectError:
+            print_colored(f"Error: Could not connect to API server at {args.host}:{args.port}", "red")
+            print_colored("Make sure the server is running with: uvicorn main:app --reload", "yellow")
+            return
     
     print_colored("=" * 50, "cyan")
     print_colored("Chat Endpoint Demo", "cyan")
@@ -191,7 +257,8 @@ def main():
             continue
         
         # Send the message to the chat endpoint
-        conversation_id = stream_chat(
+        conversation_id = await stream_chat(
+            client,
             host=args.host,
             port=args.port,
             message=message,
@@ -201,5 +268,10 @@ def main():
         )
 
 
+def main():
+    """Main function to run the demo."""
+    asyncio.run(amain())
+
+
 if __name__ == "__main__":
     main()
@@ -10,39 +10,57 @@ Usage:
     python demo_llm_wrapper.py compare
 """
 
-import os
 import sys
+from pathlib import Path
 import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Generator
 import threading
 from dotenv import load_dotenv
 
 # Add the parent directory to the path so we can import our modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 # Import the LLM service wrapper
 from llm_service_providers.index import llm_service
 from misc.constants import Provider, DEFAULT_MODELS
+from tests.demo.token_writer import TokenWriter
 
 # Load environment variables from .env file
 load_dotenv()
 
 
-def process_stream_chunk(chunk, provider_name):
-    """Process a stream chunk based on the provider."""
-    if provider_name == Provider.OPENAI:
+def openai_tokens(stream):
+    """Yield the non-empty text deltas of an OpenAI stream."""
+    for chunk in stream:
         content = chunk.choices[0].delta.content
         if content:
-            return content
-    elif provider_name == Provider.ANTHROPIC:
-        if chunk.type == "content_block_delta":
-            return chunk.delta.text
-    return ""
+            yield content
 
 
-def display_provider_stream(provider_name):
-    """Demonstrate streaming with a specific provider using its default model."""
+def anthropic_tokens(stream):
+    """Yield the non-empty text deltas of an Anthropic stream."""
+    for event in stream:
+        if event.type == "content_block_delta" and event.delta.text:
+            yield event.delta.text
+
+
+# Token extractor for each provider, picked once per stream rather than per chunk
+TOKEN_EXTRACTORS = {
+    Provider.OPENAI: openai_tokens,
+    Provider.ANTHROPIC: anthropic_tokens,
+}
+
+
+def display_provider_stream(provider_name, demo_slow: bool = False):
+    """
+    Demonstrate streaming with a specific provider using its default model.
+    
+    Args:
+        provider_name: The provider to demonstrate
+        demo_slow: Pause briefly after each token to make the streaming easier to follow
+    """
     model = DEFAULT_MODELS[provider_name]
     provider_display_name = provider_name.upper()
     
@@ -60,17 +78,19 @@ def display_provider_stream(provider_name):
         print("\nResponse:")
         
         # Stream the response and display it
-        for chunk in llm_service.stream_chat(
+        writer = TokenWriter()
+        extract_tokens = TOKEN_EXTRACTORS[provider_name]
+        for content in extract_tokens(llm_service.stream_chat(
             model=model,
             messages=messages,
             temperature=0.7,
             max_tokens=100
-        ):
-            content = process_stream_chunk(chunk, provider_name)
-            if content:
-                print(content, end="", flush=True)
+        )):
+            writer.write(content)
+            if demo_slow:
                 # Add a small delay to simulate slower streaming for demo purposes
                 time.sleep(0.01)
+        writer.flush()
         
         print("\n\nStreaming complete!")
         return True
@@ -99,25 +119,27 @@ def display_side_by_side():
         print("\nPrompt: Write a haiku about artificial intelligence")
         print("\nResponses:")
         
-        # Get OpenAI response
-        print(f"OpenAI ({openai_model}): ", end="")
-        openai_response = llm_service.get_chat_completion(
-            model=openai_model,
-            messages=messages,
-            temperature=0.7,
-            max_tokens=100
-        )
-        print(openai_response)
+        # Get both responses concurrently; the requests are independent
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            openai_future = executor.submit(
+                llm_service.get_chat_completion,
+                model=openai_model,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=100
+            )
+            anthropic_future = executor.submit(
+                llm_service.get_chat_completion,
+                model=anthropic_model,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=100
+            )
+            openai_response = openai_future.result()
+            anthropic_response = anthropic_future.result()
         
-        # Get Anthropic response
-        print(f"\nAnthropic ({anthropic_model}): ", end="")
-        anthropic_response = llm_service.get_chat_completion(
-            model=anthropic_model,
-            messages=messages,
-            temperature=0.7,
-            max_tokens=100
-        )
-        print(anthropic_response)
+        print(f"OpenAI ({openai_model}): {openai_response}")
+        print(f"\nAnthropic ({anthropic_model}): {anthropic_response}")
         
         print("\nComparison complete!")
         return True
@@ -151,16 +173,18 @@ def main():
     parser = argparse.ArgumentParser(description="Demonstrate LLM service wrapper with streaming")
     parser.add_argument("provider", choices=["openai", "anthropic", "both", "compare", "models"],
                         help="Which provider to demonstrate or action to perform")
+    parser.add_argument("--demo-slow", action="store_true",
+                        help="Pause after each streamed token to make streaming easier to follow")
     
     args = parser.parse_args()
     
     if args.provider == "openai":
-        display_provider_stream(Provider.OPENAI)
+        display_provider_stream(Provider.OPENAI, args.demo_slow)
     elif args.provider == "anthropic":
-        display_provider_stream(Provider.ANTHROPIC)
+        display_provider_stream(Provider.ANTHROPIC, args.demo_slow)
     elif args.provider == "both":
-        display_provider_stream(Provider.OPENAI)
-        display_provider_stream(Provider.ANTHROPIC)
+        display_provider_stream(Provider.OPENAI, args.demo_slow)
+        display_provider_stream(Provider.ANTHROPIC, args.demo_slow)
     elif args.provider == "compare":
         display_side_by_side()
     elif args.provider == "models":
@@ -11,30 +11,66 @@ This script demonstrates the get_message_history function with various scenarios
 
 import os
 import sys
+from pathlib import Path
 import uuid
 import json
 import argparse
 import time
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Add the parent directory to the path so we can import our modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 from llm_service_providers.index import llm_service
-from misc.db import create_conversation, add_message, get_conversation, delete_conversation
-from misc.constants import CONVERSATION_MESSAGES_THRESHOLD
+from misc.db import create_conversation, bulk_add_messages, get_conversation, delete_conversation
+from misc.constants import CONVERSATION_MESSAGES_THRESHOLD, MIN_SUMMARIZE_BATCH
 
 
-def create_demo_conversation(num_messages: int = 30) -> str:
+# Topics used in the early demo messages, lowercase for questions and as names for answers
+TOPICS = ("machine learning", "neural networks", "deep learning", "natural language processing", "computer vision")
+TOPIC_NAMES = ("Machine learning", "Neural networks", "Deep learning", "NLP", "Computer vision")
+
+
+def demo_message(i: int) -> Tuple[str, str]:
+    """
+    Build the i-th message of a demo conversation.
+    
+    Args:
+        i: Position of the message in the conversation
+        
+    Returns:
+        A (role, content) tuple; even positions are user messages
+    """
+    if i % 2 == 0:
+        if i == 0:
+            return 'user', "Hello, I'd like to learn about artificial intelligence."
+        elif i < 10:
+            return 'user', f"Can you tell me more about {TOPICS[i // 2 % 5]}?"
+        elif i < 20:
+            return 'user', f"That's interesting. How is this used in real-world applications? (Message {i})"
+        else:
+            return 'user', f"I see. What about ethical considerations? (Message {i})"
+    else:
+        if i == 1:
+            return 'assistant', "Hello! I'd be happy to help you learn about artificial intelligence."
+        elif i < 11:
+            return 'assistant', f"Certainly! {TOPIC_NAMES[i // 2 % 5]} is a fascinating field. It involves... (Message {i})"
+        elif i < 21:
+            return 'assistant', f"There are many applications in industries like healthcare, finance, and transportation. For example... (Message {i})"
+        else:
+            return 'assistant', f"Ethical considerations are very important. We need to consider issues like bias, privacy, and transparency... (Message {i})"
+
+
+def create_demo_conversation(num_messages: int = 45) -> str:
     """
     Create a demo conversation with the specified number of messages.
     
     Args:
-        num_messages: Number of messages to create (default: 30)
+        num_messages: Number of messages to create (default: 45)
         
     Returns:
         The ID of the created conversation
@@ -46,36 +82,11 @@ def create_demo_conversation(num_messages: int = 30) -> str:
         system_prompt="You are a helpful assistant."
     )
     
-    # Add messages to the conversation
-    for i in range(num_messages):
-        role = 'user' if i % 2 == 0 else 'assistant'
-        
-        if role == 'user':
-            if i == 0:
-                content = "Hello, I'd like to learn about artificial intelligence."
-            elif i < 10:
-                topics = ["machine learning", "neural networks", "deep learning", 
-                          "natural language processing", "computer vision"]
-                content = f"Can you tell me more about {topics[i//2 % len(topics)]}?"
-            elif i < 20:
-                content = f"That's interesting. How is this used in real-world applications? (Message {i})"
-            else:
-                content = f"I see. What about ethical considerations? (Message {i})"
-        else:
-            if i == 1:
-                content = "Hello! I'd be happy to help you learn about artificial intelligence."
-            elif i < 11:
-                content = f"Certainly! {['Machine learning', 'Neural networks', 'Deep learning', 'NLP', 'Computer vision'][i//2 % 5]} is a fascinating field. It involves... (Message {i})"
-            elif i < 21:
-                content = f"There are many applications in industries like healthcare, finance, and transportation. For example... (Message {i})"
-            else:
-                content = f"Ethical considerations are very important. We need to consider issues like bias, privacy, and transparency... (Message {i})"
-        
-        add_message(
-            conversation_id=conversation_id,
-            role=role,
-            content=content
-        )
+    # Build all messages first, then add them to the conversation in one batch
+    bulk_add_messages(conversation_id, [
+        {'role': role, 'content': content}
+        for role, content in map(demo_message, range(num_messages))
+    ])
     
     print(f"Created conversation with ID: {conversation_id}")
     print(f"Added {num_messages} messages to the conversation")
@@ -119,15 +130,19 @@ def demo_message_history(conversation_id: str):
     print(f"Conversation: {conversation['title']}")
     print(f"Total messages: {len(conversation['messages'])}")
     print(f"Threshold for summarization: {CONVERSATION_MESSAGES_THRESHOLD}")
+    print(f"Minimum older messages to summarize: {MIN_SUMMARIZE_BATCH}")
+    
+    # Reuse the messages fetched above instead of reading them again for each call
+    raw_messages = conversation['messages']
     
     # Get message history with summarization (default)
     start_time = time.time()
-    summarized_messages = llm_service.get_message_history(conversation_id)
+    summarized_messages = llm_service.get_message_history(conversation_id, messages=raw_messages)
     summarize_time = time.time() - start_time
     
     # Get message history without summarization
     start_time = time.time()
-    full_messages = llm_service.get_message_history(conversation_id, summarize=False)
+    full_messages = llm_service.get_message_history(conversation_id, summarize=False, messages=raw_messages)
     no_summarize_time = time.time() - start_time
     
     # Display the results
@@ -157,7 +172,7 @@ def main():
     parser = argparse.ArgumentParser(description='Demo for message history functionality')
     parser.add_argument('--create', action='store_true', help='Create a new demo conversation')
     parser.add_argument('--conversation-id', type=str, help='Use an existing conversation ID')
-    parser.add_argument('--messages', type=int, default=30, help='Number of messages to create (default: 30)')
+    parser.add_argument('--messages', type=int, default=45, help='Number of messages to create (default: 45)')
     parser.add_argument('--delete', action='store_true', help='Delete the conversation after the demo')
     
     args = parser.parse_args()
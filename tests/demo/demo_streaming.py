@@ -11,8 +11,10 @@ Usage:
 
 import os
 import sys
+from pathlib import Path
 import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Generator
 import threading
 from dotenv import load_dotenv
@@ -21,14 +23,21 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Add the parent directory to the path so we can import our modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tests.demo.token_writer import TokenWriter
 
 from llm_service_providers.openai import OpenAIChat
 from llm_service_providers.anthropic import AnthropicChat
 
 
-def display_openai_stream():
-    """Demonstrate OpenAI streaming with visual output."""
+def display_openai_stream(demo_slow: bool = False):
+    """
+    Demonstrate OpenAI streaming with visual output.
+    
+    Args:
+        demo_slow: Pause briefly after each token to make the streaming easier to follow
+    """
     print("\n" + "="*80)
     print("OPENAI STREAMING DEMO")
     print("="*80)
@@ -50,6 +59,7 @@ def display_openai_stream():
         print("\nResponse:")
         
         # Stream the response and display it
+        writer = TokenWriter()
         for chunk in openai_chat.stream_chat_completion(
             model="gpt-3.5-turbo",
             messages=messages,
@@ -58,9 +68,11 @@ def display_openai_stream():
         ):
             content = chunk.choices[0].delta.content
             if content:
-                print(content, end="", flush=True)
-                # Add a small delay to simulate slower streaming for demo purposes
-                time.sleep(0.01)
+                writer.write(content)
+                if demo_slow:
+                    # Add a small delay to simulate slower streaming for demo purposes
+                    time.sleep(0.01)
+        writer.flush()
         
         print("\n\nStreaming complete!")
         return True
@@ -70,8 +82,13 @@ def display_openai_stream():
         return False
 
 
-def display_anthropic_stream():
-    """Demonstrate Anthropic streaming with visual output."""
+def display_anthropic_stream(demo_slow: bool = False):
+    """
+    Demonstrate Anthropic streaming with visual output.
+    
+    Args:
+        demo_slow: Pause briefly after each token to make the streaming easier to follow
+    """
     print("\n" + "="*80)
     print("ANTHROPIC STREAMING DEMO")
     print("="*80)
@@ -93,6 +110,7 @@ def display_anthropic_stream():
         print("\nResponse:")
         
         # Stream the response and display it
+        writer = TokenWriter()
         for event in anthropic_chat.stream_chat_completion(
             model="claude-3-haiku-20240307",
             messages=messages,
@@ -100,9 +118,11 @@ def display_anthropic_stream():
             max_tokens=100
         ):
             if event.type == "content_block_delta":
-                print(event.delta.text, end="", flush=True)
-                # Add a small delay to simulate slower streaming for demo purposes
-                time.sleep(0.01)
+                writer.write(event.delta.text)
+                if demo_slow:
+                    # Add a small delay to simulate slower streaming for demo purposes
+                    time.sleep(0.01)
+        writer.flush()
         
         print("\n\nStreaming complete!")
         return True
@@ -142,28 +162,28 @@ def display_side_by_side():
         
         print("\nPrompt: Write a haiku about artificial intelligence")
         print("\nResponses:")
-        print("OpenAI: ", end="")
-        
-        # Get the full responses (we'll display them differently)
-        openai_response = openai_chat.get_full_completion_from_stream(
-            model="gpt-3.5-turbo",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=100
-        )
-        
-        print(openai_response)
         
-        print("Anthropic: ", end="")
-        
-        anthropic_response = anthropic_chat.get_full_completion_from_stream(
-            model="claude-3-haiku-20240307",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=100
-        )
+        # Get the full responses from both providers concurrently (we'll display them differently)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            openai_future = executor.submit(
+                openai_chat.get_full_completion_from_stream,
+                model="gpt-3.5-turbo",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=100
+            )
+            anthropic_future = executor.submit(
+                anthropic_chat.get_full_completion_from_stream,
+                model="claude-3-haiku-20240307",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=100
+            )
+            openai_response = openai_future.result()
+            anthropic_response = anthropic_future.result()
         
-        print(anthropic_response)
+        print(f"OpenAI: {openai_response}")
+        print(f"Anthropic: {anthropic_response}")
         
         print("\nComparison complete!")
         return True
@@ -178,16 +198,18 @@ def main():
     parser = argparse.ArgumentParser(description="Demonstrate LLM streaming capabilities")
     parser.add_argument("provider", choices=["openai", "anthropic", "both", "compare"],
                         help="Which provider to demonstrate")
+    parser.add_argument("--demo-slow", action="store_true",
+                        help="Pause after each streamed token to make streaming easier to follow")
     
     args = parser.parse_args()
     
     if args.provider == "openai":
-        display_openai_stream()
+        display_openai_stream(args.demo_slow)
     elif args.provider == "anthropic":
-        display_anthropic_stream()
+        display_anthropic_stream(args.demo_slow)
     elif args.provider == "both":
-        display_openai_stream()
-        display_anthropic_stream()
+        display_openai_stream(args.demo_slow)
+        display_anthropic_stream(args.demo_slow)
     elif args.provider == "compare":
         display_side_by_side()
 
@@ -9,17 +9,25 @@ Usage:
     python demo_summarization.py media
     python demo_summarization.py technical
     python demo_summarization.py compare
+    python demo_summarization.py simple --no-cache
+    python demo_summarization.py --all
 """
 
-import os
 import sys
+from pathlib import Path
 import time
 import argparse
-from typing import Dict, List, Any
+import hashlib
+import json
+import shelve
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Tuple
 from dotenv import load_dotenv
 
 # Add the parent directory to the path so we can import our modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 # Import the LLM service wrapper
 from llm_service_providers.index import llm_service
@@ -28,40 +36,112 @@ from misc.constants import Provider, DEFAULT_MODELS
 # Load environment variables from .env file
 load_dotenv()
 
+# On-disk cache of generated summaries so repeated demo runs skip the LLM call
+SUMMARY_CACHE_PATH = str(Path(tempfile.gettempdir()) / "chatapp_summary_cache")
+SUMMARY_CACHE_TTL = 86400
+
+# Set to False by --no-cache to always call the LLM
+USE_SUMMARY_CACHE = True
+
+# shelve does not support concurrent access, so --all demos take turns opening it
+_SUMMARY_CACHE_LOCK = threading.Lock()
+
+
+def summary_cache_key(messages: List[Dict[str, str]], max_tokens: int, temperature: float) -> str:
+    """
+    Build a stable cache key for a summary request.
+    
+    Args:
+        messages: The conversation messages being summarized
+        max_tokens: Maximum number of tokens for the summary
+        temperature: Temperature for generation
+    
+    Returns:
+        A hex digest identifying the request
+    """
+    payload = json.dumps([messages, max_tokens, temperature], sort_keys=True).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def cached_summary(messages: List[Dict[str, str]], max_tokens: int = 500, temperature: float = 0.3) -> Tuple[str, bool]:
+    """
+    Summarize a conversation, reusing a cached summary when one is available.
+    
+    Args:
+        messages: The conversation messages to summarize
+        max_tokens: Maximum number of tokens for the summary
+        temperature: Temperature for generation
+    
+    Returns:
+        A tuple of (summary, whether it came from the cache)
+    """
+    if USE_SUMMARY_CACHE:
+        key = summary_cache_key(messages, max_tokens, temperature)
+        with _SUMMARY_CACHE_LOCK, shelve.open(SUMMARY_CACHE_PATH) as cache:
+            entry = cache.get(key)
+        if entry is not None and time.time() - entry[0] < SUMMARY_CACHE_TTL:
+            return entry[1], True
+    
+    # Call the LLM outside the lock so demos running in parallel are not serialized
+    summary = llm_service.brief_summary_of_conversation_history(
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature
+    )
+    
+    if USE_SUMMARY_CACHE:
+        with _SUMMARY_CACHE_LOCK, shelve.open(SUMMARY_CACHE_PATH) as cache:
+            cache[key] = (time.time(), summary)
+    
+    return summary, False
+
+
+def write_lines(lines: List[str]) -> None:
+    """Write lines to stdout with a single write and flush."""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
 
 def display_summary(title, messages):
-    """Display a summary of the given conversation."""
-    print("\n" + "="*80)
-    print(f"{title}")
-    print(f"Using model: gpt-4o-mini")
-    print("="*80)
-    
-    print("\nOriginal Conversation:")
-    print("-" * 40)
+    """
+    Display a summary of the given conversation.
+    
+    Returns:
+        A dict with "success", "cached" and "elapsed_ms" so callers can aggregate timings
+    """
+    lines = [
+        "",
+        "=" * 80,
+        title,
+        "Using model: gpt-4o-mini",
+        "=" * 80,
+        "",
+        "Original Conversation:",
+        "-" * 40
+    ]
     for msg in messages:
-        role = msg["role"].upper()
-        content = msg["content"]
-        print(f"{role}: {content[:100]}{'...' if len(content) > 100 else ''}")
+        # Slice one character past the limit to tell whether the content was truncated
+        head = msg["content"][:101]
+        suffix = "..." if len(head) > 100 else ""
+        lines.append(f"{msg['role'].upper()}: {head[:100]}{suffix}")
+    
+    # Show the header and conversation before the LLM call so progress is visible
+    lines += ["", "Generating summary..."]
+    write_lines(lines)
     
-    print("\nGenerating summary...")
     try:
-        start_time = time.time()
-        summary = llm_service.brief_summary_of_conversation_history(
-            messages=messages,
-            max_tokens=500,
-            temperature=0.3
-        )
-        end_time = time.time()
+        start = time.perf_counter()
+        summary, cached = cached_summary(messages, max_tokens=500, temperature=0.3)
+        elapsed = time.perf_counter() - start
         
-        print(f"\nSummary (generated in {end_time - start_time:.2f} seconds):")
-        print("-" * 40)
-        print(summary)
-        print("\n")
-        return True
+        source = "cached" if cached else f"generated in {elapsed:.3f} seconds"
+        # Name the demo, since with --all the summaries arrive after every header
+        write_lines(["", f"{title} ({source}):", "-" * 40, summary, "", ""])
+        return {"success": True, "cached": cached, "elapsed_ms": elapsed * 1000}
     
     except Exception as e:
-        print(f"\nError generating summary: {e}")
-        return False
+        write_lines(["", f"{title}: error generating summary: {e}"])
+        return {"success": False, "cached": False, "elapsed_ms": None}
 
 
 def demo_simple_conversation():
@@ -119,22 +199,38 @@ def demo_compare_models():
     return display_summary("BLOCKCHAIN CONVERSATION SUMMARY", messages)
 
 
+# Demo functions by the demo_type argument that selects them
+_DEMOS = {
+    "simple": demo_simple_conversation,
+    "media": demo_media_conversation,
+    "technical": demo_technical_conversation,
+    "compare": demo_compare_models
+}
+
+
 def main():
     """Main function to run the demo."""
     parser = argparse.ArgumentParser(description="Demonstrate conversation summarization")
-    parser.add_argument("demo_type", choices=["simple", "media", "technical", "compare"],
+    parser.add_argument("demo_type", nargs="?", choices=list(_DEMOS),
                         help="Which type of demo to run")
+    parser.add_argument("--all", action="store_true",
+                        help="Run every demo in parallel")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always call the LLM instead of reusing cached summaries")
     
     args = parser.parse_args()
+    if not args.all and args.demo_type is None:
+        parser.error("a demo type is required unless --all is given")
+    
+    global USE_SUMMARY_CACHE
+    USE_SUMMARY_CACHE = not args.no_cache
     
-    if args.demo_type == "simple":
-        demo_simple_conversation()
-    elif args.demo_type == "media":
-        demo_media_conversation()
-    elif args.demo_type == "technical":
-        demo_technical_conversation()
-    elif args.demo_type == "compare":
-        demo_compare_models()
+    if args.all:
+        # Each demo waits on the LLM API, so running them together takes about as long as one
+        with ThreadPoolExecutor(max_workers=len(_DEMOS)) as executor:
+            list(executor.map(lambda demo: demo(), _DEMOS.values()))
+    else:
+        _DEMOS[args.demo_type]()
 
 
 if __name__ == "__main__":
@@ -5,11 +5,17 @@ This module provides common functionality used across all test files.
 """
 
 import unittest
-from unittest.mock import MagicMock, patch
+from functools import lru_cache
+from unittest.mock import Mock, patch
+from sqlalchemy.orm import Session
 from fastapi.testclient import TestClient
 from datetime import datetime
-import uuid
+import ipaddress
+import itertools
+import os
+import socket
 import json
+from types import SimpleNamespace
 from typing import Dict, List, Any, Optional
 
 # Import the FastAPI app
@@ -19,76 +25,181 @@ from database.models import ConversationModel, MessageModel
 from llm_service_providers.index import llm_service
 
 
+# Headers for requests whose body is pre-encoded with orjson
+JSON_HEADERS = {"content-type": "application/json"}
+
+# Models returned by the fake LLM service
+_FAKE_MODELS = {
+    "openai": ["gpt-4o-mini", "gpt-4o"],
+    "anthropic": ["claude-3-5-haiku-20241022", "claude-sonnet-4-20250514"]
+}
+
+# Stream chunks returned by the fake LLM service, built once as plain objects
+_FAKE_STREAM = [
+    SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+    for content in ("Hello", " world", "!")
+]
+
+# Chunk repeated by the high-volume fake stream used for perf runs
+_FAST_CHUNK = SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="token"))])
+
+# Number of chunks yielded by the high-volume fake stream
+_FAST_STREAM_LENGTH = 512
+
+# Whether this is a perf run using the high-volume fake stream, read once at import
+_PERF_TEST = bool(os.getenv("CHATAPP_PERF_TEST"))
+
+
+def _lite_stream(*args, **kwargs):
+    """Return the short fake stream used by correctness tests as an iterator, like the SDKs do."""
+    return iter(_FAKE_STREAM)
+
+
+def _fast_stream(*args, **kwargs):
+    """Yield one shared chunk many times to mimic a long real stream."""
+    chunk = _FAST_CHUNK
+    for _ in range(_FAST_STREAM_LENGTH):
+        yield chunk
+
+# Sequence for fixture ids; unique within a run without reading os.urandom
+_FIXTURE_IDS = itertools.count(1)
+
+
+def next_fixture_id() -> str:
+    """Return the next fixture id as a 32-character hex string."""
+    return f"{next(_FIXTURE_IDS):032x}"
+
+
+def _build_conversation_template():
+    """Build the conversation and message fields shared by every mock conversation."""
+    now = datetime.now().isoformat()
+    conversation = {
+        "id": None,
+        "title": "Test Conversation",
+        "created_at": now,
+        "updated_at": now,
+        "user_id": "test-user",
+        "model": "gpt-4o-mini",
+        "system_prompt": "You are a helpful assistant.",
+        "first_user_message": "Hello, how are you?",
+        "first_assistant_message": "I'm doing well, thank you for asking!",
+        "metadata": {"test": "metadata"},
+        "message_count": 0
+    }
+    messages = tuple(
+        {
+            "id": next_fixture_id(),
+            "conversation_id": None,
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"Test message {i+1}",
+            "created_at": now,
+            "tokens": 10,
+            "model": "gpt-4o-mini",
+            "metadata": {}
+        }
+        for i in range(3)
+    )
+    return conversation, messages
+
+
+# Mock conversation fields built once; callers get copies with a fresh id
+_CONVERSATION_TEMPLATE, _MESSAGE_TEMPLATES = _build_conversation_template()
+
+# Mock database session shared by all test classes; it is reset before each test
+_MOCK_DB = Mock(spec=Session)
+
+# Whether the app is in test mode; set for each test class and undone by its cleanup
+_INITIALIZED = False
+
+# Original socket methods, wrapped so tests cannot reach the network
+_SOCKET_CONNECT = socket.socket.connect
+_SOCKET_CONNECT_EX = socket.socket.connect_ex
+
+
+def _is_loopback(host: Any) -> bool:
+    """Whether a socket address host refers to this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _check_address(sock: socket.socket, address: Any) -> None:
+    """Fail fast when a test tries to open an internet connection; local services stay reachable."""
+    if sock.family in (socket.AF_INET, socket.AF_INET6) and not _is_loopback(address[0]):
+        raise RuntimeError(f"Network access is disabled in tests (tried to connect to {address})")
+
+
+def _guarded_connect(self, address):
+    """socket.connect that refuses internet addresses."""
+    _check_address(self, address)
+    return _SOCKET_CONNECT(self, address)
+
+
+def _guarded_connect_ex(self, address):
+    """socket.connect_ex that refuses internet addresses."""
+    _check_address(self, address)
+    return _SOCKET_CONNECT_EX(self, address)
+
+
+def _initialize():
+    """Enable database test mode and block network access until _restore is called."""
+    global _INITIALIZED
+    if not _INITIALIZED:
+        set_test_mode(True)
+        
+        # Every test runs against mocks; a real LLM or database call should fail, not hang
+        socket.socket.connect = _guarded_connect
+        socket.socket.connect_ex = _guarded_connect_ex
+        _INITIALIZED = True
+
+
+def _restore():
+    """Undo _initialize so later tests and modules see the app's normal state."""
+    global _INITIALIZED
+    if _INITIALIZED:
+        set_test_mode(False)
+        app.dependency_overrides.pop(get_db, None)
+        socket.socket.connect = _SOCKET_CONNECT
+        socket.socket.connect_ex = _SOCKET_CONNECT_EX
+        _INITIALIZED = False
+
+
+@lru_cache(maxsize=1)
+def _shared_client() -> TestClient:
+    """Create the test client once and share it across all test classes."""
+    return TestClient(app)
+
+
 class BaseTest(unittest.TestCase):
     """Base test class with common setup and utility methods."""
     
     @classmethod
     def setUpClass(cls):
         """Set up test class."""
-        # Enable test mode for the database
-        set_test_mode(True)
-        
-        # Create a test client
-        cls.client = TestClient(app)
-        
-        # Create a mock session
-        cls.mock_db = MagicMock()
-        
-        # Set up the dependency override
-        app.dependency_overrides[get_db] = lambda: cls.mock_db
-    
-    @classmethod
-    def tearDownClass(cls):
-        """Clean up after tests."""
-        # Disable test mode
-        set_test_mode(False)
-        
-        # Remove the dependency override
-        app.dependency_overrides.clear()
+        _initialize()
+        cls.addClassCleanup(_restore)
+        cls.client = _shared_client()
+        cls.mock_db = _MOCK_DB
     
     def setUp(self):
         """Set up before each test."""
-        # Reset the mock
+        # Reset the mock and make sure the dependency override points at it
         self.mock_db.reset_mock()
+        app.dependency_overrides[get_db] = lambda: self.mock_db
     
-    def create_mock_conversation_dict(self, include_messages: bool = True) -> Dict[str, Any]:
+    @classmethod
+    def create_mock_conversation_dict(cls, include_messages: bool = True) -> Dict[str, Any]:
         """Create a mock conversation dictionary."""
-        conv_id = str(uuid.uuid4())
-        now = datetime.now().isoformat()
-        
-        # Create a conversation dictionary
-        conversation = {
-            "id": conv_id,
-            "title": "Test Conversation",
-            "created_at": now,
-            "updated_at": now,
-            "user_id": "test-user",
-            "model": "gpt-4o-mini",
-            "system_prompt": "You are a helpful assistant.",
-            "first_user_message": "Hello, how are you?",
-            "first_assistant_message": "I'm doing well, thank you for asking!",
-            "metadata": {"test": "metadata"},
-            "message_count": 0
-        }
+        conversation = _CONVERSATION_TEMPLATE.copy()
+        conversation["id"] = conv_id = next_fixture_id()
         
         # Add messages if requested
         if include_messages:
-            messages = []
-            for i in range(3):
-                msg = {
-                    "id": str(uuid.uuid4()),
-                    "conversation_id": conv_id,
-                    "role": "user" if i % 2 == 0 else "assistant",
-                    "content": f"Test message {i+1}",
-                    "created_at": now,
-                    "tokens": 10,
-                    "model": "gpt-4o-mini",
-                    "metadata": {}
-                }
-                messages.append(msg)
-            
-            conversation["messages"] = messages
-            conversation["message_count"] = len(messages)
+            conversation["messages"] = [{**msg, "conversation_id": conv_id} for msg in _MESSAGE_TEMPLATES]
+            conversation["message_count"] = len(_MESSAGE_TEMPLATES)
         else:
             conversation["messages"] = []
         
@@ -103,17 +214,9 @@ class BaseTest(unittest.TestCase):
         """Create a list of mock conversation objects."""
         return [self.create_mock_conversation(include_messages=False) for _ in range(count)]
     
-    def mock_llm_service(self):
+    @classmethod
+    def mock_llm_service(cls):
         """Mock the LLM service for testing."""
-        # Mock the get_available_models method
-        llm_service.get_available_models = MagicMock(return_value={
-            "openai": ["gpt-4o-mini", "gpt-4o"],
-            "anthropic": ["claude-3-5-haiku-20241022", "claude-sonnet-4-20250514"]
-        })
-        
-        # Mock the stream_chat method
-        llm_service.stream_chat = MagicMock(return_value=[
-            MagicMock(choices=[MagicMock(delta=MagicMock(content="Hello"))]),
-            MagicMock(choices=[MagicMock(delta=MagicMock(content=" world"))]),
-            MagicMock(choices=[MagicMock(delta=MagicMock(content="!"))])
-        ])
+        llm_service.get_available_models = lambda: _FAKE_MODELS
+        # Use the long stream for perf runs (CHATAPP_PERF_TEST=1), the short one otherwise
+        llm_service.stream_chat = _fast_stream if _PERF_TEST else _lite_stream
@@ -6,131 +6,156 @@ This module tests the following endpoint:
 """
 
 import unittest
-from unittest.mock import MagicMock, patch, AsyncMock
+from unittest.mock import Mock, patch, AsyncMock
 import json
-import uuid
-from tests.test_base import BaseTest
+import orjson
+import httpx
+from types import SimpleNamespace
+from main import app
+from routes.chat import stream_generator
+from llm_service_providers.index import llm_service
+from tests.test_base import BaseTest, JSON_HEADERS, next_fixture_id
 from database.crud import create_conversation, add_message, get_message_history
 from schema.chat import ChatRequest
 
 
-class TestChatEndpoint(BaseTest):
+class TestChatEndpoint(BaseTest, unittest.IsolatedAsyncioTestCase):
     """Test the chat API endpoint."""
     
-    def setUp(self):
-        """Set up before each test."""
-        super().setUp()
-        self.mock_llm_service()
+    # ID of the sample conversation
+    _CID = next_fixture_id()
+    
+    # Request payloads, built once and shared by every test
+    _PAYLOAD_NEW = {
+        "model": "gpt-4o-mini",
+        "message": "Hello, how are you?",
+        "system_prompt": "You are a helpful assistant."
+    }
+    _PAYLOAD_EXISTING = {**_PAYLOAD_NEW, "conversation_session_id": _CID}
+    _PAYLOAD_NO_SUM = {**_PAYLOAD_EXISTING, "summarize_history": False}
+    _PAYLOAD_TITLED = {**_PAYLOAD_NEW, "title": "Custom Conversation Title"}
+    _INVALID_MODEL_BODY = orjson.dumps({**_PAYLOAD_NEW, "model": "invalid-model"})
+    
+    # Encoded payloads that should produce a streamed response
+    _STREAMING_CASES = (
+        ("new_conversation", orjson.dumps(_PAYLOAD_NEW)),
+        ("existing_conversation", orjson.dumps(_PAYLOAD_EXISTING)),
+        ("summarize_history_false", orjson.dumps(_PAYLOAD_NO_SUM)),
+        ("custom_title", orjson.dumps(_PAYLOAD_TITLED)),
+    )
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by every test in the class."""
+        super().setUpClass()
+        cls.mock_llm_service()
         
-        # Create a sample chat request
-        self.chat_request = {
-            "model": "gpt-4o-mini",
-            "message": "Hello, how are you?",
-            "system_prompt": "You are a helpful assistant."
-        }
+        # Contents of the fake LLM stream, which depends on CHATAPP_PERF_TEST
+        cls.stream_contents = [chunk.choices[0].delta.content for chunk in llm_service.stream_chat()]
         
         # Create a sample conversation
-        self.conversation_id = str(uuid.uuid4())
-        self.mock_conversation = self.create_mock_conversation_dict()
-        self.mock_conversation['id'] = self.conversation_id
+        cls.conversation_id = cls._CID
+        cls.mock_conversation = cls.create_mock_conversation_dict()
+        cls.mock_conversation['id'] = cls.conversation_id
         
         # Mock the message history
-        self.mock_messages = [
+        cls.mock_messages = [
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": "Hello, how are you?"}
         ]
-    
-    def test_chat_new_conversation(self):
-        """Test the POST /api/chat endpoint with a new conversation."""
-        # Create a mock conversation dictionary
-        mock_conversation = self.create_mock_conversation_dict()
         
-        # Mock the create_conversation, add_message, and get_message_history functions
-        with patch("routes.chat.create_conversation", return_value=mock_conversation), \
-            patch("routes.chat.add_message", return_value={}), \
-            patch("routes.chat.get_message_history", return_value=self.mock_messages):
-            
-            # Make the request
-            response = self.client.post("/api/chat", json=self.chat_request)
-            
-            # Check the response
-            self.assertEqual(response.status_code, 200)
-            # Content type might include charset, so check if it starts with text/event-stream
-            self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
-    
-    def test_chat_existing_conversation(self):
-        """Test the POST /api/chat endpoint with an existing conversation."""
-        # Update the chat request to include a conversation ID
-        chat_request_with_id = self.chat_request.copy()
-        chat_request_with_id["conversation_session_id"] = self.conversation_id
+        # Mock the database functions used by the chat route
+        cls.mock_add_message = Mock(return_value={})
+        cls.enterClassContext(patch.multiple(
+            "routes.chat",
+            create_conversation=Mock(return_value=cls.mock_conversation),
+            add_message=cls.mock_add_message,
+            get_message_history=Mock(return_value=cls.mock_messages)
+        ))
         
-        # Mock the add_message and get_message_history functions
-        with patch("routes.chat.add_message", return_value=MagicMock()), \
-             patch("routes.chat.get_message_history", return_value=self.mock_messages):
-            
-            # Make the request
-            response = self.client.post("/api/chat", json=chat_request_with_id)
-            
-            # Check the response
-            self.assertEqual(response.status_code, 200)
-            # Content type might include charset, so check if it starts with text/event-stream
-            self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        # Skip the per-chunk pacing delay in the streaming route
+        cls.enterClassContext(patch("routes.chat.asyncio.sleep", new=AsyncMock(return_value=None)))
+    
+    async def test_chat_streams_response(self):
+        """Test the POST /api/chat endpoint with different request payloads."""
+        # Drive the app on this test's event loop instead of through the TestClient portal thread
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for name, payload in self._STREAMING_CASES:
+                with self.subTest(name):
+                    async with client.stream("POST", "/api/chat", content=payload, headers=JSON_HEADERS) as response:
+                        # Check the response
+                        self.assertEqual(response.status_code, 200)
+                        # Content type might include charset, so check if it starts with text/event-stream
+                        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+                        
+                        # Read the SSE frames of the body
+                        frames = [
+                            orjson.loads(line[len("data: "):])
+                            async for line in response.aiter_lines()
+                            if line.startswith("data: ")
+                        ]
+                    
+                    # The first frame carries the first chunk and the last one completes the stream
+                    self.assertEqual(frames[0]["content"], self.stream_contents[0])
+                    self.assertFalse(frames[0]["done"])
+                    self.assertTrue(frames[-1]["done"])
+                    self.assertEqual(frames[-1]["conversation_id"], self.conversation_id)
+                    
+                    # The reply is saved with the session from the overridden get_db dependency
+                    self.assertEqual(self.mock_add_message.call_args.kwargs["role"], "assistant")
+                    self.assertIs(self.mock_add_message.call_args.kwargs["db"], self.mock_db)
     
     def test_chat_invalid_model(self):
         """Test the POST /api/chat endpoint with an invalid model."""
-        # Update the chat request to include an invalid model
-        invalid_model_request = self.chat_request.copy()
-        invalid_model_request["model"] = "invalid-model"
-        
         # Mock the get_available_models method to return no models
         with patch("routes.chat.llm_service.get_available_models", 
                   return_value={"openai": ["gpt-4o-mini"]}):
             
             
             # Make the request
-            response = self.client.post("/api/chat", json=invalid_model_request)
+            response = self.client.post("/api/chat", content=self._INVALID_MODEL_BODY, headers=JSON_HEADERS)
             
             # Check the response
             self.assertEqual(response.status_code, 400)
-            self.assertIn("not available", response.json()["detail"])
+            self.assertIn("not available", orjson.loads(response.content)["detail"])
     
-    def test_chat_with_summarize_history_false(self):
-        """Test the POST /api/chat endpoint with summarize_history=False."""
-        # Update the chat request to disable history summarization
-        no_summarize_request = self.chat_request.copy()
-        no_summarize_request["summarize_history"] = False
-        no_summarize_request["conversation_session_id"] = self.conversation_id
+    async def test_stream_backpressure_nonbuffered(self):
+        """Test that each SSE frame is sent before the next LLM chunk is read."""
+        pulled = []
         
-        # Mock the add_message and get_message_history functions
-        with patch("routes.chat.add_message", return_value=MagicMock()), \
-             patch("routes.chat.get_message_history", return_value=self.mock_messages):
-            
-            # Make the request
-            response = self.client.post("/api/chat", json=no_summarize_request)
-            
-            # Check the response
-            self.assertEqual(response.status_code, 200)
-            # Content type might include charset, so check if it starts with text/event-stream
-            self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
-    
-    def test_chat_with_custom_title(self):
-        """Test the POST /api/chat endpoint with a custom title."""
-        # Update the chat request to include a custom title
-        titled_request = self.chat_request.copy()
-        titled_request["title"] = "Custom Conversation Title"
+        def tracking_stream(*args, **kwargs):
+            # Record each chunk as the route pulls it from the provider stream
+            for content in ("Hello", " world", "!"):
+                pulled.append(content)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
         
-        # Mock the create_conversation, add_message, and get_message_history functions
-        with patch("routes.chat.create_conversation", return_value=self.mock_conversation), \
-             patch("routes.chat.add_message", return_value=MagicMock()), \
-             patch("routes.chat.get_message_history", return_value=self.mock_messages):
-            
-            # Make the request
-            response = self.client.post("/api/chat", json=titled_request)
-            
-            # Check the response
-            self.assertEqual(response.status_code, 200)
-            # Content type might include charset, so check if it starts with text/event-stream
-            self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        with patch("routes.chat.llm_service.stream_chat", new=tracking_stream):
+            frames = stream_generator("gpt-4o-mini", self.mock_messages, self.conversation_id, self.mock_db)
+            try:
+                # The first frame must arrive after exactly one chunk has been read
+                first = await frames.__anext__()
+                self.assertEqual(pulled, ["Hello"])
+                self.assertEqual(orjson.loads(first[len(b"data: "):])["content"], "Hello")
+                
+                await frames.__anext__()
+                self.assertEqual(pulled, ["Hello", " world"])
+            finally:
+                await frames.aclose()
+    
+    async def test_assistant_message_saved_before_done(self):
+        """Test that the full assistant response is saved with the request session before the final event."""
+        with patch("routes.chat.add_message", return_value={}) as mock_add_message:
+            async for frame in stream_generator("gpt-4o-mini", self.mock_messages, self.conversation_id, self.mock_db):
+                if orjson.loads(frame[len(b"data: "):])["done"]:
+                    # The reply is already stored when the client learns the stream is complete
+                    mock_add_message.assert_called_once()
+                    self.assertIs(mock_add_message.call_args.kwargs["db"], self.mock_db)
+                    self.assertEqual(mock_add_message.call_args.kwargs["role"], "assistant")
+                    self.assertEqual(mock_add_message.call_args.kwargs["content"], "".join(self.stream_contents))
+                    break
+            else:
+                self.fail("The stream ended without a final event")
 
 
 if __name__ == "__main__":
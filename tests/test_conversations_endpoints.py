@@ -8,6 +8,7 @@ This module tests the following endpoints:
 """
 
 import unittest
+import orjson
 from unittest.mock import MagicMock, patch
 from tests.test_base import BaseTest
 from database.crud import get_all_conversations, get_conversation, delete_conversation
@@ -21,23 +22,30 @@ class TestConversationsEndpoints(BaseTest):
         # Create mock conversations
         mock_conversations = [self.create_mock_conversation_dict(include_messages=False) for _ in range(5)]
         
-        # Debug: Print mock data
-        print("\nMock conversations:")
-        for i, conv in enumerate(mock_conversations):
-            print(f"Conv {i}: {conv.keys()}")
-        
         # Mock the get_all_conversations function at the module level where it's used
         with patch("routes.conversations.get_all_conversations", return_value=mock_conversations):
             # Make the request
             response = self.client.get("/api/conversations?user_id=test-user&limit=10&offset=0")
             
-            # Debug: Print response
-            print(f"\nResponse status: {response.status_code}")
-            print(f"Response JSON: {response.json()}")
+            # Check the response
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(orjson.loads(response.content)), 5)
+    
+    def test_list_conversations_without_message_count(self):
+        """Test that rows without a message_count are listed with a count of 0."""
+        # Create a mock conversation without the message_count key
+        mock_conversation = self.create_mock_conversation_dict(include_messages=False)
+        del mock_conversation["message_count"]
+        
+        with patch("routes.conversations.get_all_conversations", return_value=[mock_conversation]):
+            # Make the request
+            response = self.client.get("/api/conversations?user_id=test-user")
             
             # Check the response
             self.assertEqual(response.status_code, 200)
-            self.assertEqual(len(response.json()), 5)
+            data = orjson.loads(response.content)
+            self.assertEqual(len(data), 1)
+            self.assertEqual(data[0]["message_count"], 0)
     
     def test_get_conversation_by_id(self):
         """Test the GET /api/conversations/{conversation_id} endpoint."""
@@ -51,10 +59,11 @@ class TestConversationsEndpoints(BaseTest):
             
             # Check the response
             self.assertEqual(response.status_code, 200)
-            self.assertEqual(response.json()["id"], mock_conversation["id"])
-            self.assertEqual(response.json()["title"], mock_conversation["title"])
-            self.assertIn("messages", response.json())
-            self.assertEqual(len(response.json()["messages"]), 3)
+            data = orjson.loads(response.content)
+            self.assertEqual(data["id"], mock_conversation["id"])
+            self.assertEqual(data["title"], mock_conversation["title"])
+            self.assertIn("messages", data)
+            self.assertEqual(len(data["messages"]), 3)
             
             # We're patching at the module level, so we can't verify the function calls directly
     
@@ -67,7 +76,7 @@ class TestConversationsEndpoints(BaseTest):
             
             # Check the response
             self.assertEqual(response.status_code, 404)
-            self.assertIn("not found", response.json()["detail"])
+            self.assertIn("not found", orjson.loads(response.content)["detail"])
     
     def test_delete_conversation_by_id(self):
         """Test the DELETE /api/conversations/{conversation_id} endpoint."""
@@ -82,7 +91,7 @@ class TestConversationsEndpoints(BaseTest):
             
             # Check the response
             self.assertEqual(response.status_code, 200)
-            self.assertIn("deleted successfully", response.json()["message"])
+            self.assertIn("deleted successfully", orjson.loads(response.content)["message"])
             
             # We're patching at the module level, so we can't verify the function calls directly
     
@@ -95,7 +104,7 @@ class TestConversationsEndpoints(BaseTest):
             
             # Check the response
             self.assertEqual(response.status_code, 404)
-            self.assertIn("not found", response.json()["detail"])
+            self.assertIn("not found", orjson.loads(response.content)["detail"])
     
     def test_delete_conversation_by_id_failure(self):
         """Test the DELETE /api/conversations/{conversation_id} endpoint with a deletion failure."""
@@ -110,7 +119,7 @@ class TestConversationsEndpoints(BaseTest):
             
             # Check the response
             self.assertEqual(response.status_code, 500)
-            self.assertIn("Failed to delete", response.json()["detail"])
+            self.assertIn("Failed to delete", orjson.loads(response.content)["detail"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+"""
+Tests for conversation history summarization in the LLM service.
+
+The summary store is a temporary SQLite database and the summarizing LLM call
+is replaced with a mock, so these tests only exercise the caching around it.
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+from unittest.mock import patch
+from tests.test_base import BaseTest
+from llm_service_providers.index import llm_service
+from misc import db
+from misc.constants import CONVERSATION_MESSAGES_THRESHOLD, MIN_SUMMARIZE_BATCH
+
+
+class TestMessageHistorySummary(BaseTest):
+    """Test that get_message_history stores and reuses conversation summaries."""
+    
+    _CID = "summary-test-conversation"
+    _SUMMARY = "- The user and assistant talked"
+    
+    def setUp(self):
+        """Point the summary store at an empty database and mock the summarizer."""
+        super().setUp()
+        temp_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.db_path = os.path.join(temp_dir, "chatapp-v2.db")
+        self.enterContext(patch.object(db, "DB_PATH", self.db_path))
+        self.summarize = self.enterContext(patch.object(
+            llm_service, "brief_summary_of_conversation_history", return_value=self._SUMMARY
+        ))
+        
+        # Enough messages that the older ones are summarized
+        self.messages = [
+            {"role": "user" if i % 2 == 0 else "assistant", "content": f"Message {i}"}
+            for i in range(CONVERSATION_MESSAGES_THRESHOLD + MIN_SUMMARIZE_BATCH)
+        ]
+    
+    def _summary_rows(self):
+        """Return the number of stored summary rows."""
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            return conn.execute("SELECT COUNT(*) FROM conversation_summaries").fetchone()[0]
+    
+    def test_summary_reused_for_unchanged_history(self):
+        """Test that a second call with the same history does not summarize again."""
+        db.init_db()
+        
+        first = llm_service.get_message_history(self._CID, messages=self.messages)
+        second = llm_service.get_message_history(self._CID, messages=self.messages)
+        
+        # One LLM call, and both calls return the summary followed by the recent window
+        self.summarize.assert_called_once()
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]["role"], "system")
+        self.assertIn(self._SUMMARY, first[0]["content"])
+        self.assertEqual(first[1:], self.messages[-CONVERSATION_MESSAGES_THRESHOLD:])
+    
+    def test_summary_regenerated_after_edit(self):
+        """Test that editing an older message invalidates the stored summary."""
+        db.init_db()
+        llm_service.get_message_history(self._CID, messages=self.messages)
+        
+        # Same number of messages, different content
+        self.messages[0]["content"] = "Edited message"
+        llm_service.get_message_history(self._CID, messages=self.messages)
+        
+        # The summary is regenerated and replaces the earlier row
+        self.assertEqual(self.summarize.call_count, 2)
+        self.assertEqual(self._summary_rows(), 1)
+    
+    def test_summary_without_summary_table(self):
+        """Test that a database without the summaries table still gets a summary."""
+        history = llm_service.get_message_history(self._CID, messages=self.messages)
+        
+        self.summarize.assert_called_once()
+        self.assertIn(self._SUMMARY, history[0]["content"])
+        self.assertEqual(len(history), CONVERSATION_MESSAGES_THRESHOLD + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ This module tests the following endpoints:
 """
 
 import unittest
+import orjson
 from unittest.mock import MagicMock, patch
 from tests.test_base import BaseTest
 
@@ -15,10 +16,18 @@ from tests.test_base import BaseTest
 class TestModelsEndpoints(BaseTest):
     """Test the models API endpoints."""
     
-    def setUp(self):
-        """Set up before each test."""
-        super().setUp()
-        self.mock_llm_service()
+    # Expected responses, built once for the whole class
+    _EXPECTED_OPENAI = ["gpt-4o-mini", "gpt-4o"]
+    _EXPECTED_ANTHROPIC = ["claude-3-5-haiku-20241022", "claude-sonnet-4-20250514"]
+    _EXPECTED_ALL = {"openai": _EXPECTED_OPENAI, "anthropic": _EXPECTED_ANTHROPIC}
+    _PROVIDER_CASES = (("openai", _EXPECTED_OPENAI), ("anthropic", _EXPECTED_ANTHROPIC))
+    _EXPECTED_DEFAULTS = {"openai": "gpt-4o-mini", "anthropic": "claude-3-5-haiku-20241022"}
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by every test in the class."""
+        super().setUpClass()
+        cls.mock_llm_service()
     
     def test_get_all_models(self):
         """Test the GET /api/models endpoint."""
@@ -27,28 +36,18 @@ class TestModelsEndpoints(BaseTest):
         
         # Check the response
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json(), {
-            "openai": ["gpt-4o-mini", "gpt-4o"],
-            "anthropic": ["claude-3-5-haiku-20241022", "claude-sonnet-4-20250514"]
-        })
-    
-    def test_get_provider_models_openai(self):
-        """Test the GET /api/models/openai endpoint."""
-        # Make the request
-        response = self.client.get("/api/models/openai")
-        
-        # Check the response
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json(), ["gpt-4o-mini", "gpt-4o"])
+        self.assertEqual(orjson.loads(response.content), self._EXPECTED_ALL)
     
-    def test_get_provider_models_anthropic(self):
-        """Test the GET /api/models/anthropic endpoint."""
-        # Make the request
-        response = self.client.get("/api/models/anthropic")
-        
-        # Check the response
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json(), ["claude-3-5-haiku-20241022", "claude-sonnet-4-20250514"])
+    def test_get_provider_models(self):
+        """Test the GET /api/models/{provider} endpoint for each provider."""
+        for provider, expected in self._PROVIDER_CASES:
+            with self.subTest(provider=provider):
+                # Make the request
+                response = self.client.get(f"/api/models/{provider}")
+                
+                # Check the response
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(orjson.loads(response.content), expected)
     
     def test_get_provider_models_invalid_provider(self):
         """Test the GET /api/models/{provider} endpoint with an invalid provider."""
@@ -57,7 +56,7 @@ class TestModelsEndpoints(BaseTest):
         
         # Check the response
         self.assertEqual(response.status_code, 400)
-        self.assertIn("Invalid provider", response.json()["detail"])
+        self.assertIn("Invalid provider", orjson.loads(response.content)["detail"])
     
     def test_get_provider_models_unavailable_provider(self):
         """Test the GET /api/models/{provider} endpoint with an unavailable provider."""
@@ -69,7 +68,7 @@ class TestModelsEndpoints(BaseTest):
             
             # Check the response
             self.assertEqual(response.status_code, 404)
-            self.assertIn("not available", response.json()["detail"])
+            self.assertIn("not available", orjson.loads(response.content)["detail"])
     
     def test_get_default_models(self):
         """Test the GET /api/models-default endpoint."""
@@ -78,10 +77,7 @@ class TestModelsEndpoints(BaseTest):
         
         # Check the response
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json(), {
-            "openai": "gpt-4o-mini",
-            "anthropic": "claude-3-5-haiku-20241022"
-        })
+        self.assertEqual(orjson.loads(response.content), self._EXPECTED_DEFAULTS)
     
     def test_get_default_models_partial_availability(self):
         """Test the GET /api/models-default endpoint with partial provider availability."""
@@ -93,7 +89,7 @@ class TestModelsEndpoints(BaseTest):
             
             # Check the response
             self.assertEqual(response.status_code, 200)
-            self.assertEqual(response.json(), {
+            self.assertEqual(orjson.loads(response.content), {
                 "openai": "gpt-4o-mini"
             })
 
@@ -0,0 +1,88 @@
+"""
+Tests for the OpenAI provider's streaming request path.
+
+The HTTP client underneath the OpenAI SDK is intercepted at ``send`` so the
+outgoing request can be inspected and a canned server-sent event stream
+returned without touching the network.
+"""
+
+import json
+import sys
+import unittest
+from unittest.mock import patch
+from tests.test_base import BaseTest
+from llm_service_providers.openai import OpenAIChat
+
+
+def _sse_event(content):
+    """Encode one chat completion chunk as a server-sent event."""
+    chunk = {
+        "id": "chatcmpl-test",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+    }
+    return b"data: " + json.dumps(chunk).encode() + b"\n\n"
+
+
+class TestOpenAIStreaming(BaseTest):
+    """Test that OpenAIChat streams completions over server-sent events."""
+    
+    _TOKENS = ("Hel", "lo", "!")
+    _MESSAGES = [{"role": "user", "content": "Hello"}]
+    
+    def setUp(self):
+        """Intercept the SDK's HTTP client before each test."""
+        super().setUp()
+        self.chat = OpenAIChat(api_key="test-key")
+        self.requests = []
+        self.send_kwargs = []
+        self.pulled = []
+        
+        def body():
+            for token in self._TOKENS:
+                self.pulled.append(token)
+                yield _sse_event(token)
+            yield b"data: [DONE]\n\n"
+        
+        def fake_send(client, request, **kwargs):
+            self.requests.append(request)
+            self.send_kwargs.append(kwargs)
+            # Build the response with the same httpx module the SDK uses
+            response_cls = sys.modules[type(request).__module__.split(".")[0]].Response
+            return response_cls(
+                200,
+                headers={"content-type": "text/event-stream"},
+                content=body(),
+                request=request,
+            )
+        
+        self.enterContext(patch.object(type(self.chat.client._client), "send", new=fake_send))
+    
+    def test_stream_request_uses_sse(self):
+        """Test that the request asks for a streamed, unbuffered response."""
+        tokens = [
+            chunk.choices[0].delta.content
+            for chunk in self.chat.stream_chat_completion("gpt-4o-mini", self._MESSAGES)
+        ]
+        
+        # One request, sent with a streamed response body and stream enabled in the payload
+        self.assertEqual(len(self.requests), 1)
+        self.assertIs(self.send_kwargs[0].get("stream"), True)
+        self.assertIs(json.loads(self.requests[0].content)["stream"], True)
+        self.assertEqual(tokens, list(self._TOKENS))
+    
+    def test_stream_yields_before_body_is_read(self):
+        """Test that each chunk is yielded as soon as its event arrives."""
+        stream = self.chat.stream_chat_completion("gpt-4o-mini", self._MESSAGES)
+        
+        # Only the first event has been read when the first chunk is yielded
+        first = next(iter(stream))
+        self.assertEqual(first.choices[0].delta.content, self._TOKENS[0])
+        self.assertEqual(self.pulled, [self._TOKENS[0]])
+        stream.close()
+
+
+if __name__ == "__main__":
+    unittest.main()